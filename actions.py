@@ -1,120 +1,232 @@
 # actions.py
 from pybricks.parameters import Stop, Color, Button
-from pybricks.tools import wait
+from pybricks.tools import wait, StopWatch
 import config
 import hardware
+import speech
+import choreography
+import classifier
+import homing
+import obstacle
+import sensing
+import telemetry
+import tracing
 
-def initialize_robot():
+trash_classifier = classifier.TrashClassifier(config.TRASH_DB)
+
+ready_ms = -1  # program start to "Press center" in the last initialize_robot()
+
+def initialize_robot(boot_timer=None):
+    global ready_ms
+    if boot_timer is None:
+        boot_timer = StopWatch()
     try:
         hardware.ev3.screen.load_image('logo.png')
     except:
         pass # Skip if logo.png is not found
     
     hardware.ev3.light.on(Color.ORANGE)
-    hardware.ev3.speaker.say("Initialize")
-    hardware.arm_lift.reset_angle(0)
-    hardware.arm_lift.run_target(config.ARM_SPEED, config.ARM_SAFE_POS)
-    wait(300)
-    hardware.ev3.speaker.say("Clamp")
-    hardware.clamp.run_until_stalled(config.CLAMP_SPEED, then=Stop.COAST, duty_limit=config.CLAMP_FORCE)
-    hardware.clamp.run_until_stalled(-config.CLAMP_SPEED, then=Stop.HOLD, duty_limit=config.CLAMP_FORCE)
+    speech.warm_up()
+    speech.say("Initialize")
+    
+    # 🆕 FAST BOOT: arm and clamp home at the same time; after a clean
+    # shutdown the saved angles replace the clamp's open/close stall cycle
+    saved = homing.load(config.HOMING_FILE) if config.FAST_BOOT else None
+    hardware.arm_lift.reset_angle(saved.get("arm", 0) if saved else 0)
+    home = choreography.Choreography("HOMING")
+    home.add(choreography.Target("arm safe", hardware.arm_lift, config.ARM_SPEED, config.ARM_SAFE_POS))
+    if saved and "clamp" in saved:
+        hardware.clamp.reset_angle(saved["clamp"])
+        home.add(choreography.Stall("clamp check", hardware.clamp, -config.CLAMP_SPEED,
+                                    config.CLAMP_FORCE, Stop.HOLD))
+        home.run()
+        if abs(hardware.clamp.angle() - saved["clamp"]) > config.HOMING_TOLERANCE:
+            print("Clamp moved {} deg in the check: full homing".format(
+                hardware.clamp.angle() - saved["clamp"]))
+            _home_clamp()
+    else:
+        _home_clamp(home)
     hardware.clamp.reset_angle(0)
+    
+    ready_ms = boot_timer.time()
+    print("Ready in {} ms".format(ready_ms))
     hardware.ev3.light.on(Color.YELLOW)
-    hardware.ev3.speaker.say("Press center")
+    speech.say("Press center")
     while Button.CENTER not in hardware.ev3.buttons.pressed():
         wait(20)
     while Button.CENTER in hardware.ev3.buttons.pressed():
         wait(20)
     hardware.ev3.light.on(Color.GREEN)
 
-def check_station(target_id, color, reflection):
-    # Dynamic check based on config.py lists
-    if target_id == 1:
-        return (color in config.STATION_1_COLOR) and (config.STATION_1_MIN <= reflection <= config.STATION_1_MAX)
-    elif target_id == 2:
-        return (color in config.STATION_2_COLOR) and (config.STATION_2_MIN <= reflection <= config.STATION_2_MAX)
-    elif target_id == 3:
-        return (color in config.STATION_3_COLOR) and (config.STATION_3_MIN <= reflection <= config.STATION_3_MAX)
-    return False
+def _home_clamp(home=None):
+    # Stall open, then shut (added to home, which may already move the arm)
+    speech.say("Clamp")
+    if home is None:
+        home = choreography.Choreography("CLAMP HOMING")
+    opened = home.add(choreography.Stall("clamp open", hardware.clamp, config.CLAMP_SPEED,
+                                         config.CLAMP_FORCE))
+    home.add(choreography.Stall("clamp shut", hardware.clamp, -config.CLAMP_SPEED,
+                                config.CLAMP_FORCE, Stop.HOLD, after=[opened]))
+    home.run()
 
-def park_and_shutdown():
+def park_and_shutdown(ticker=None, heap=None, locator=None):
     hardware.robot.stop()
+    if heap is not None:
+        heap.stop()
+        heap.report()
+    if ticker is not None:
+        ticker.report()
+    if locator is not None:
+        locator.report()
     hardware.ev3.light.on(Color.RED)
-    hardware.ev3.speaker.say("Shutdown")
+    speech.say("Shutdown")
     hardware.clamp.run_until_stalled(-config.CLAMP_SPEED, then=Stop.HOLD, duty_limit=config.CLAMP_FORCE)
     hardware.arm_lift.run_target(config.ARM_SPEED, config.ARM_DOWN_POS)
     wait(300)
-    hardware.ev3.speaker.beep()
+    # Parked: the next boot can start from these angles
+    homing.save(config.HOMING_FILE, {"arm": hardware.arm_lift.angle(),
+                                     "clamp": hardware.clamp.angle()})
+    speech.beep()
+    speech.announcer.wait_idle()  # the beep and anything still queued
+    telemetry.log(telemetry.STOP)
+    telemetry.flush()
+    tracing.close()
     
 def unload_sequence():
-    hardware.robot.stop()
+    unload = choreography.Choreography("UNLOAD")
+    stop = unload.add(choreography.Call("stop", hardware.robot.stop))
     
     # 1. Turn to Bin
-    hardware.robot.turn(150)
+    turned = unload.add(choreography.Turn("turn to bin", hardware.robot, config.UNLOAD_TURN_RATE,
+                                          config.UNLOAD_TURN, after=[stop]))
     
     # 2. Ultrasonic Approach (Stop at 6cm)
-    while hardware.obstacle_sensor.distance() > 60:
-        hardware.robot.drive(30, 0) 
-        wait(10)
-    hardware.robot.stop()
+    near = unload.add(choreography.Approach("approach", hardware.robot, obstacle.detector,
+                                            config.UNLOAD_SPEED, config.UNLOAD_BIN_DIST,
+                                            config.UNLOAD_APPROACH_MAX, after=[turned]))
     
-    # 3. 🆕 EXTRA NUDGE (Move forward a bit more)
-    # Drives slowly (30 speed) for 3 seconds to clear the gap
-    hardware.robot.drive(30, 0)
-    wait(3000)
-    hardware.robot.stop()
+    # 3. EXTRA NUDGE: a measured distance instead of 3 s of blind driving
+    nudged = unload.add(choreography.Straight("nudge", hardware.robot, config.UNLOAD_SPEED,
+                                              config.UNLOAD_NUDGE, after=[near]))
     
     # 4. Drop Item
-    hardware.arm_lift.run_target(config.ARM_SPEED, config.ARM_SAFE_POS, wait=False)
-    hardware.clamp.run_target(config.CLAMP_SPEED, config.CLAMP_OPEN_ANGLE)
-    wait(500)
-    
-    # 5. Reverse (Increased distance slightly to account for the extra nudge)
-    hardware.robot.straight(-150)
-    
-    # 6. Reset Clamp
-    hardware.clamp.run_until_stalled(-config.CLAMP_SPEED, duty_limit=40)
-    hardware.clamp.reset_angle(0)
-    
-    # 7. Return Turn
-    hardware.robot.turn(-150)
-    
+    unload.add(choreography.Target("arm safe", hardware.arm_lift, config.ARM_SPEED,
+                                   config.ARM_SAFE_POS, after=[nudged]))
+    opened = unload.add(choreography.Target("clamp open", hardware.clamp, config.CLAMP_SPEED,
+                                            config.CLAMP_OPEN_ANGLE, after=[nudged]))
+    dropped = unload.add(choreography.Pause("drop", 500, after=[opened]))
+    
+    # 5. Reverse, while 6. the clamp re-homes
+    backed = unload.add(choreography.Straight("reverse", hardware.robot, config.UNLOAD_REVERSE_SPEED,
+                                                 -config.UNLOAD_REVERSE, after=[dropped]))
+    unload.add(choreography.Stall("clamp home", hardware.clamp, -config.CLAMP_SPEED, 40,
+                                  reset_angle=0, after=[dropped]))
+    
+    # 7. Return Turn (does not wait for the clamp)
+    unload.add(choreography.Turn("turn back", hardware.robot, config.UNLOAD_TURN_RATE,
+                                 -config.UNLOAD_TURN, after=[backed]))
+    return unload.run()
+    
+def recover_station(on_pad, turned=0):
+    """Backs up at most config.RECOVER_REVERSE mm until on_pad() is true,
+    to come back to a station passed unseen, and drives forward again
+    (still looking) if it was not found. True: stopped on the pad.
+    turned: degrees the robot has turned on the corner patch so far
+    (robot.angle() since the white began). That turn is undone before
+    reversing, so the robot backs up along the line before the corner
+    instead of straight off it; it is turned in again when the robot
+    comes back without the pad."""
+    recover = choreography.Choreography("RECOVER")
+    stop = recover.add(choreography.Call("stop", hardware.robot.stop))
+    if turned:
+        stop = recover.add(choreography.Turn("square up", hardware.robot, config.UNLOAD_TURN_RATE,
+                                             -turned, after=[stop]))
+    back = recover.add(choreography.Seek("reverse", hardware.robot, config.RECOVER_SPEED,
+                                         -config.RECOVER_REVERSE, on_pad, after=[stop]))
+    recover.run()
+    if back.hit:
+        return True
+    ahead = choreography.Choreography("RECOVER RETURN")
+    forward = ahead.add(choreography.Seek("return", hardware.robot, config.RECOVER_SPEED,
+                                          config.RECOVER_REVERSE, on_pad))
+    ahead.run()
+    if not forward.hit and turned:
+        back_in = choreography.Choreography("RECOVER TURN IN")
+        back_in.add(choreography.Turn("turn in", hardware.robot, config.UNLOAD_TURN_RATE, turned))
+        back_in.run()
+    return forward.hit
+
 def pick_and_drop():
-    hardware.robot.stop() 
-    wait(100) 
-    hardware.ev3.speaker.say("Object")
-    
-    # 1. Approach
-    hardware.robot.drive(30, 0)
-    wait(1000) 
-    hardware.robot.stop()
-    
-    # 2. Pick Up Sequence
-    hardware.clamp.run_target(config.CLAMP_SPEED, config.CLAMP_OPEN_ANGLE)
-    hardware.arm_lift.run_target(config.ARM_SPEED, config.ARM_DOWN_POS)
-    
+    speech.say("Object")
+    pick = choreography.Choreography("PICK")
+    stop = pick.add(choreography.Call("stop", hardware.robot.stop))
+    settle = pick.add(choreography.Pause("settle", 100, after=[stop]))
+    
+    # 1. Approach by the filtered distance (the clamp opens on the way, it
+    # does not touch the object)
+    approach = pick.add(choreography.Reach("approach", hardware.robot, obstacle.detector,
+                                           config.APPROACH_SPEED, config.PICK_REACH,
+                                           config.APPROACH_MAX, after=[settle]))
+    opened = pick.add(choreography.Target("clamp open", hardware.clamp,
+                                          config.CLAMP_SPEED, config.CLAMP_OPEN_ANGLE))
+    
+    # 2. Pick Up Sequence (arm lowers while the clamp is still opening)
+    lowered = pick.add(choreography.Target("arm down", hardware.arm_lift,
+                                           config.ARM_SPEED, config.ARM_DOWN_POS, after=[approach]))
     # ⚠️ FIXED: Added "-" to CLAMP_SPEED to make it CLOSE (Negative direction)
-    hardware.clamp.run_until_stalled(-config.CLAMP_SPEED, duty_limit=config.CLAMP_FORCE, then=Stop.HOLD)
-    
-    hardware.arm_lift.run_target(config.ARM_SPEED, config.ARM_SAFE_POS)
-    
-    # 3. Identify
-    item, col, ref = identify_trash()
-    hardware.ev3.speaker.say(item)
+    closed = pick.add(choreography.Stall("clamp close", hardware.clamp, -config.CLAMP_SPEED,
+                                         config.CLAMP_FORCE, Stop.HOLD, after=[lowered, opened]))
+    pick.add(choreography.Target("arm up", hardware.arm_lift,
+                                 config.ARM_SPEED, config.ARM_SAFE_POS, after=[closed]))
+    
+    # 3. Identify while the arm is still going up
+    start_identify()
+    pick.add(choreography.Poll("identify", sample_trash, config.ID_SAMPLE_GAP, after=[closed]))
+    telemetry.log(telemetry.PICKUP, duration=pick.run())
+    item, col, ref = finish_identify()
+    speech.say(item)
     
     return item, col, ref
 
-def identify_trash():
-    col = hardware.clamp_sensor.color()
-    ref = hardware.clamp_sensor.reflection()
-    
-    print("[DEBUG] SENSOR: " + str(col) + " | " + str(ref) + "%")
+# Identification: votes over clamp sensor samples until the result can no
+# longer change. pick_and_drop() samples during the lift; identify_trash()
+# does the same standing still.
+_id_started = 0
+_id_finished = 0  # when the vote was decided, not when the lift ended
+_id_col = None
+_id_ref = 0
+
+def start_identify():
+    global _id_started, _id_finished
+    _id_started = -1
+    _id_finished = -1
+    trash_classifier.reset()
 
-    if ref <= 6:
-        return "None", col, ref
+def sample_trash():
+    # One sample; True once the vote is decided
+    global _id_started, _id_finished, _id_col, _id_ref
+    if _id_started < 0:
+        _id_started = telemetry.now()
+    _id_col = hardware.clamp_sensor.color()
+    _id_ref = hardware.clamp_sensor.reflection()
+    decided = trash_classifier.add(sensing.color_code(_id_col), _id_ref)
+    if decided and _id_finished < 0:
+        _id_finished = telemetry.now()
+    return decided
 
-    for name, mi, ma, colors in config.TRASH_DB:
-        if mi <= ref <= ma and col in colors:
-            return name, col, ref
-            
-    return "Others", col, ref
\ No newline at end of file
+def finish_identify():
+    col, ref = _id_col, _id_ref
+    item, confidence, samples = trash_classifier.result()
+    finished = _id_finished if _id_finished >= 0 else telemetry.now()
+    telemetry.log(telemetry.IDENTIFY, duration=finished - _id_started,
+                  item=trash_classifier.labels.index(item), color=sensing.color_code(col),
+                  reflection=ref, confidence=confidence)
+    print("[DEBUG] SENSOR: " + str(col) + " | " + str(ref) + "% -> " + item +
+          " (" + str(confidence) + "% of " + str(samples) + ")")
+    return item, col, ref
+
+def identify_trash():
+    start_identify()
+    while not sample_trash():
+        wait(config.ID_SAMPLE_GAP)
+    return finish_identify()
@@ -0,0 +1,11 @@
+# _paths.py - makes the robot modules and the sim/ stand-ins importable on a PC
+import sys
+
+try:
+    import os.path
+    ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for _p in (ROOT, os.path.join(ROOT, "sim")):
+        if _p not in sys.path:
+            sys.path.insert(0, _p)
+except ImportError:
+    pass  # MicroPython: run from the project folder on the brick instead
@@ -0,0 +1,48 @@
+# bench_line_sensor.py
+# Tick rate of the mission loop's line-sensor reads: color()+reflection() per
+# tick (two mode switches) versus one RGB read through sensing.ColorSampler.
+#
+#   python3 bench/bench_line_sensor.py --switch-ms 25 --ticks 200
+import argparse
+import time
+
+import _paths  # noqa: F401
+from fakes import FakeColorSensor
+import sensing
+
+def run_dual(sensor, ticks, tick_ms):
+    for _ in range(ticks):
+        sensor.color()
+        sensor.reflection()
+        time.sleep(tick_ms / 1000)
+
+def run_rgb(sensor, ticks, tick_ms):
+    line = sensing.ColorSampler(sensor)
+    line.rgb_mode = True  # whatever config.LINE_RGB says
+    for _ in range(ticks):
+        line.read()
+        time.sleep(tick_ms / 1000)
+
+def measure(name, fn, args):
+    sensor = FakeColorSensor(switch_ms=args.switch_ms, read_ms=args.read_ms)
+    start = time.perf_counter()
+    fn(sensor, args.ticks, args.tick_ms)
+    elapsed = time.perf_counter() - start
+    print("{:<22} {:7.2f} ms/tick {:7.1f} ticks/s  switches={}".format(
+        name, 1000 * elapsed / args.ticks, args.ticks / elapsed, sensor.switches))
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Line sensor tick-rate benchmark")
+    parser.add_argument("--switch-ms", type=float, default=25, help="mode switch latency")
+    parser.add_argument("--read-ms", type=float, default=1, help="latency of every read")
+    parser.add_argument("--tick-ms", type=float, default=10, help="wait() at the end of each tick")
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    dual = measure("color()+reflection()", run_dual, args)
+    rgb = measure("rgb() sampler", run_rgb, args)
+    print("speed-up: {:.2f}x".format(dual / rgb))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# bench_mission.py
+# Full-mission throughput on the simulated track (sim/run.py): sorts per hour,
+# time-to-bin per material, station detection latency, control loop tick
+# percentiles and the time spent in each actions.* function. Results go to a
+# JSON file tagged with the git commit so runs can be compared across commits.
+#
+#   python3 bench/bench_mission.py --minutes 15 --seeds 3 -o before.json
+#   python3 bench/bench_mission.py --set DRIVE_SPEED=70 --compare before.json
+import argparse
+import json
+import subprocess
+import sys
+
+import _paths  # noqa: F401
+import run
+
+class Probe:
+    """Hooks into one simulated mission: stands in for tracing.py's recorder
+    to get the decisions, and wraps actions.* and the tick scheduler."""
+
+    def __init__(self):
+        self.world = None
+        self.decisions = []
+        self.actions = {}
+        self.ticks = None
+
+    def setup(self, w):
+        self.world = w
+        import tracing
+        import scheduler
+        import actions
+        tracing.recorder = self
+        probe = self
+
+        report = scheduler.TickScheduler.report
+        def report_and_keep(ticker):
+            probe.ticks = ticker.stats()
+            report(ticker)
+        scheduler.TickScheduler.report = report_and_keep
+
+        for name in dir(actions):
+            fn = getattr(actions, name)
+            if callable(fn) and getattr(fn, "__module__", None) == "actions":
+                setattr(actions, name, self.timed(name, fn))
+
+    def timed(self, name, fn):
+        def call(*args, **kwargs):
+            start = self.world.now()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.actions.setdefault(name, []).append(self.world.now() - start)
+        return call
+
+    # tracing.py recorder interface
+    def decision(self, kind, value):
+        self.decisions.append((self.world.now(), kind, value))
+
+    def close(self):
+        pass
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+# An arrival this long after the line sensor last reached that station's pad
+# was triggered by something else (another pad of the same color)
+FALSE_ARRIVAL_MS = 1000
+
+def detection_latency(w, decisions):
+    # Arrival (or pass, with SKIP_STOP) decision time minus the last time the
+    # line sensor reached that pad; returns (latencies, false arrivals)
+    latencies = []
+    false_arrivals = 0
+    for t, kind, station in decisions:
+        if kind not in ("arrive", "pass"):
+            continue
+        entered = [e[0] for e in w.events if e[1] == "station_enter"
+                   and e[2]["station"] == station and e[0] <= t]
+        if entered and t - entered[-1] <= FALSE_ARRIVAL_MS:
+            latencies.append(t - entered[-1])
+        else:
+            false_arrivals += 1
+    return latencies, false_arrivals
+
+def run_once(seed, minutes, overrides, **world_args):
+    probe = Probe()
+    w = run.run_mission(overrides=overrides, stop_ms=minutes * 60000, seed=seed,
+                        setup=probe.setup, **world_args)
+    hours = w.now() / 3600000
+    latencies, false_arrivals = detection_latency(w, probe.decisions)
+    return {
+        "seed": seed,
+        "sim_s": w.now() / 1000,
+        "wall_s": w.wall_s,
+        "laps": w.laps(),
+        "sorts": len(w.sorted),
+        "correct": sum(1 for entry in w.sorted if entry[3]),
+        "sorts_per_hour": len(w.sorted) / hours if hours else 0,
+        "time_to_bin": [(entry[1], entry[0] - entry[4]) for entry in w.sorted],
+        "detection_ms": latencies,
+        "false_arrivals": false_arrivals,
+        "worn_pads": sum(1 for e in w.events if e[1] == "station_enter" and e[2]["worn"]),
+        "checkpoints": sum(1 for t, kind, station in probe.decisions if kind == "missed"),
+        "ticks": probe.ticks,
+        "actions": probe.actions,
+    }
+
+def summarize(runs):
+    sim_h = sum(r["sim_s"] for r in runs) / 3600
+    sorts = sum(r["sorts"] for r in runs)
+    to_bin = {}
+    for r in runs:
+        for material, ms in r["time_to_bin"]:
+            to_bin.setdefault(material, []).append(ms)
+    detection = [ms for r in runs for ms in r["detection_ms"]]
+    actions = {}
+    for r in runs:
+        for name, times in r["actions"].items():
+            actions.setdefault(name, []).extend(times)
+    ticks = [r["ticks"] for r in runs if r["ticks"]]
+    return {
+        "sorts_per_hour": sorts / sim_h if sim_h else 0,
+        "sorts": sorts,
+        "correct": sum(r["correct"] for r in runs),
+        "time_to_bin_s": {m: sum(v) / len(v) / 1000 for m, v in sorted(to_bin.items())},
+        "detection_ms_p50": percentile(detection, 50),
+        "detection_ms_p99": percentile(detection, 99),
+        "false_arrivals": sum(r["false_arrivals"] for r in runs),
+        "worn_pads": sum(r["worn_pads"] for r in runs),
+        "checkpoints": sum(r["checkpoints"] for r in runs),
+        "tick_p50_ms": max(t["period_p50"] for t in ticks) if ticks else None,
+        "tick_p99_ms": max(t["period_p99"] for t in ticks) if ticks else None,
+        "overruns": sum(t["overruns"] for t in ticks),
+        "action_s": {name: sum(v) / len(v) / 1000 for name, v in sorted(actions.items())},
+        "action_calls": {name: len(v) for name, v in sorted(actions.items())},
+    }
+
+def git_commit():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                         cwd=_paths.ROOT, text=True).strip()
+        dirty = subprocess.call(["git", "diff", "--quiet", "HEAD"], cwd=_paths.ROOT) != 0
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def flatten(summary):
+    rows = []
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            rows += [(key + "." + k, v) for k, v in value.items()]
+        else:
+            rows.append((key, value))
+    return rows
+
+def show(summary, baseline=None):
+    old = dict(flatten(baseline)) if baseline else {}
+    for key, value in flatten(summary):
+        if value is None:
+            continue
+        line = "{:32s} {:10.2f}".format(key, value)
+        if isinstance(old.get(key), (int, float)):
+            line += "   was {:10.2f}   ({:+.2f})".format(old[key], value - old[key])
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Mission throughput benchmark")
+    parser.add_argument("--minutes", type=float, default=10, help="sim time per run")
+    parser.add_argument("--seeds", type=int, default=1, help="runs, with seeds 0..N-1")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a config.py setting")
+    parser.add_argument("--ghost-echo", type=float, default=0.0, metavar="SHARE",
+                        help="share of ultrasonic reads that return a stray short echo")
+    parser.add_argument("--worn-pads", type=float, default=0.0, metavar="SHARE",
+                        help="share of station pad crossings the line sensor does not see")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--compare", help="JSON from an earlier run to show deltas against")
+    args = parser.parse_args()
+
+    overrides = run.parse_overrides(args.set)
+    runs = []
+    for seed in range(args.seeds):
+        runs.append(run_once(seed, args.minutes, overrides, ghost_echo=args.ghost_echo,
+                             worn_pads=args.worn_pads))
+        sys.stderr.write("seed {}: {} sorts in {:.0f} s sim ({:.1f} s wall)\n".format(
+            seed, runs[-1]["sorts"], runs[-1]["sim_s"], runs[-1]["wall_s"]))
+    result = {
+        "commit": git_commit(),
+        "overrides": overrides,
+        "ghost_echo": args.ghost_echo,
+        "worn_pads": args.worn_pads,
+        "minutes": args.minutes,
+        "summary": summarize(runs),
+        "runs": runs,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print("compared with {} {}".format(baseline.get("commit"), baseline.get("overrides")))
+    show(result["summary"], baseline["summary"] if baseline else None)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=1)
+
+if __name__ == "__main__":
+    main()
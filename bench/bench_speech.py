@@ -0,0 +1,70 @@
+# bench_speech.py
+# Time per sort with blocking speech, with the speech.Announcer queue, and with
+# the queue playing from speech.PhraseCache. One "sort" is the announce/motion
+# pattern of pick_and_drop, the station arrival and unload_sequence, with
+# motions replaced by sleeps.
+#
+#   python3 bench/bench_speech.py --synth-ms 600 --sorts 3
+import argparse
+import sys
+import tempfile
+import time
+import types
+
+import _paths  # noqa: F401
+from fakes import FakeSpeaker
+import config
+
+# (phrase or None, motion ms after it)
+SORT = [
+    ("Object", 1000),          # approach drive
+    (None, 1500),              # open clamp, lower arm, close, lift
+    ("Plastic", 4000),         # identify, drive to the station
+    ("Plastic Station", 0),
+    ("Dropping", 5500),        # unload_sequence
+]
+
+def run(say, args):
+    start = time.perf_counter()
+    for _ in range(args.sorts):
+        for text, motion_ms in SORT:
+            if text is not None:
+                say(text)
+            time.sleep(motion_ms * args.scale / 1000)
+    return (time.perf_counter() - start) / args.sorts / args.scale
+
+def main():
+    parser = argparse.ArgumentParser(description="Speech latency benchmark")
+    parser.add_argument("--synth-ms", type=float, default=600, help="fixed synthesis cost")
+    parser.add_argument("--per-char-ms", type=float, default=40, help="playback cost per character")
+    parser.add_argument("--scale", type=float, default=1.0, help="time scale for all latencies")
+    parser.add_argument("--sorts", type=int, default=2)
+    args = parser.parse_args()
+
+    speaker = FakeSpeaker(args.synth_ms * args.scale, args.per_char_ms * args.scale)
+    # speech.py binds to hardware.ev3.speaker; give it the stand-in
+    sys.modules["hardware"] = types.SimpleNamespace(ev3=types.SimpleNamespace(speaker=speaker))
+    config.SPEECH_CACHE = False
+    import speech
+
+    blocking = run(speaker.say, args)
+    queued = run(speech.say, args)
+    speech.announcer.wait_idle()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = speech.PhraseCache(speaker, directory, render=speaker.render)
+        cache.warm_up(speech.vocabulary())
+        cached_blocking = run(cache.speak, args)
+        cached_announcer = speech.Announcer(cache.speak)
+        cached = run(cached_announcer.say, args)
+        cached_announcer.wait_idle()
+
+    print("blocking say():         {:6.2f} s/sort".format(blocking))
+    print("Announcer queue:        {:6.2f} s/sort  (saved {:.2f})".format(queued, blocking - queued))
+    print("blocking, phrase cache: {:6.2f} s/sort  (saved {:.2f})".format(
+        cached_blocking, blocking - cached_blocking))
+    print("queue + phrase cache:   {:6.2f} s/sort  (saved {:.2f}, cache hits={} misses={})".format(
+        cached, blocking - cached, cache.hits, cache.misses))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# bench_stations.py
+# Per-tick station check: the original if/elif check_station and the later
+# config.STATIONS scan against the compiled stations.StationTable. MicroPython
+# compatible, so it can also be run on the brick: pybricks-micropython bench_stations.py
+import time
+try:
+    import _paths  # noqa: F401
+except ImportError:
+    pass
+import config
+import sensing
+import stations
+
+def legacy_check_station(target_id, color, reflection):
+    # actions.check_station as it was before the table
+    if target_id == 1:
+        return (color in config.STATION_1_COLOR) and (config.STATION_1_MIN <= reflection <= config.STATION_1_MAX)
+    elif target_id == 2:
+        return (color in config.STATION_2_COLOR) and (config.STATION_2_MIN <= reflection <= config.STATION_2_MAX)
+    elif target_id == 3:
+        return (color in config.STATION_3_COLOR) and (config.STATION_3_MIN <= reflection <= config.STATION_3_MAX)
+    return False
+
+def dynamic_check_station(target_id, color, reflection):
+    # actions.check_station as it was between the if/elif and the table:
+    # a scan of config.STATIONS (kept here for reference only)
+    if not 1 <= target_id <= len(config.STATIONS):
+        return False
+    colors, lo, hi = config.STATIONS[target_id - 1]
+    return (color in colors) and (lo <= reflection <= hi)
+
+try:
+    ticks_us = time.ticks_us
+    ticks_diff = time.ticks_diff
+except AttributeError:
+    def ticks_us():
+        return int(time.perf_counter() * 1000000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+def bench(name, fn, samples, rounds):
+    start = ticks_us()
+    for _ in range(rounds):
+        for target, cell, color, ref in samples:
+            fn(target, cell, color, ref)
+    us = ticks_diff(ticks_us(), start)
+    calls = rounds * len(samples)
+    print("{:<14} {:8.3f} us/check".format(name, us / calls))
+    return us
+
+def main(rounds=20):
+    table = stations.StationTable(config.STATIONS)
+    samples = []
+    for code in range(len(sensing.COLORS)):
+        for ref in range(0, 101, 7):
+            for target in range(1, len(config.STATIONS) + 1):
+                samples.append((target, code * sensing.REFL_STEPS + ref, sensing.COLORS[code], ref))
+
+    # Both must agree on every sample before timing anything
+    for target, cell, color, ref in samples:
+        hit = table.rows[target][cell] == 1
+        if legacy_check_station(target, color, ref) != hit or \
+                dynamic_check_station(target, color, ref) != hit:
+            print("MISMATCH", target, color, ref)
+            return
+
+    legacy = bench("if/elif", lambda t, c, col, r: legacy_check_station(t, col, r), samples, rounds)
+    dynamic = bench("STATIONS scan", lambda t, c, col, r: dynamic_check_station(t, col, r), samples, rounds)
+    # main.py reads the row directly with the sampler's precomputed cell
+    rows = table.rows
+    compiled = bench("table row", lambda t, c, col, r: rows[t][c] == 1, samples, rounds)
+    print("speed-up: {:.2f}x (scan {:.2f}x)".format(legacy / compiled, dynamic / compiled))
+
+main()
@@ -0,0 +1,193 @@
+# sweep.py
+# Parameter sweep over config.py on the simulated track: every configuration
+# runs full missions (bench_mission.run_once, same seeds for all) in a process
+# pool across the CPU cores, and the results come out as a table ranked by
+# sorts per hour, with lap time and detection errors (false station arrivals,
+# items dropped at the wrong station).
+#
+# A full grid (--grid), or random search over ranges (--range) with optional
+# refinement rounds that resample around the best configurations so far.
+#
+#   python3 bench/sweep.py --grid THRESHOLD=50,54,58 --grid CORNER_COOLDOWN=150,200,300
+#   python3 bench/sweep.py --range CRUISE_SPEED=60:140 --range THRESHOLD=48:60 \
+#       --samples 200 --refine 3 --minutes 20 -o overnight.json
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import _paths  # noqa: F401
+import run
+import bench_mission
+
+# ---- search space ----
+def parse_grid(items):
+    # KEY=a,b,c -> {KEY: [a, b, c]}
+    grid = {}
+    for item in items:
+        key, values = item.split("=", 1)
+        grid[key.strip()] = [run.parse_value(v.strip()) for v in values.split(",")]
+    return grid
+
+def parse_ranges(items):
+    # KEY=lo:hi -> {KEY: (lo, hi)}; ints stay ints
+    ranges = {}
+    for item in items:
+        key, values = item.split("=", 1)
+        lo, hi = (run.parse_value(v.strip()) for v in values.split(":"))
+        ranges[key.strip()] = (min(lo, hi), max(lo, hi))
+    return ranges
+
+def draw(rng, lo, hi):
+    if isinstance(lo, int) and isinstance(hi, int):
+        return rng.randint(lo, hi)
+    return round(rng.uniform(lo, hi), 3)
+
+def grid_configs(grid):
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+def random_configs(rng, grid, ranges, count):
+    configs = []
+    for _ in range(count):
+        config = {key: rng.choice(values) for key, values in grid.items()}
+        for key, (lo, hi) in ranges.items():
+            config[key] = draw(rng, lo, hi)
+        configs.append(config)
+    return configs
+
+def refined_configs(rng, parents, grid, ranges, count, shrink):
+    """New configurations around the best ones so far: range values move by
+    up to shrink x the range width, grid values to a neighbouring choice."""
+    configs = []
+    for i in range(count):
+        parent = parents[i % len(parents)]
+        config = dict(parent)
+        for key, values in grid.items():
+            at = values.index(parent[key])
+            config[key] = values[max(0, min(len(values) - 1, at + rng.randint(-1, 1)))]
+        for key, (lo, hi) in ranges.items():
+            reach = (hi - lo) * shrink
+            value = parent[key] + rng.uniform(-reach, reach)
+            value = max(lo, min(hi, value))
+            config[key] = int(round(value)) if isinstance(lo, int) and isinstance(hi, int) \
+                else round(value, 3)
+        configs.append(config)
+    return configs
+
+def key_of(config):
+    return tuple(sorted((k, repr(v)) for k, v in config.items()))
+
+# ---- one configuration (runs in a worker process) ----
+def evaluate(job):
+    params, base, seeds, minutes = job
+    overrides = dict(base)
+    overrides.update(params)
+    start = time.perf_counter()
+    try:
+        runs = [bench_mission.run_once(seed, minutes, overrides) for seed in range(seeds)]
+    except Exception as e:  # a bad value (e.g. a negative speed) is a result too
+        return {"params": params, "error": "{}: {}".format(type(e).__name__, e),
+                "wall_s": time.perf_counter() - start}
+    summary = bench_mission.summarize(runs)
+    laps = sum(r["laps"] for r in runs)
+    return {
+        "params": params,
+        "sorts_per_hour": summary["sorts_per_hour"],
+        "lap_s": sum(r["sim_s"] for r in runs) / laps if laps else None,
+        "sorts": summary["sorts"],
+        "wrong_station": summary["sorts"] - summary["correct"],
+        "false_arrivals": summary["false_arrivals"],
+        "detection_ms_p50": summary["detection_ms_p50"],
+        "overruns": summary["overruns"],
+        "wall_s": time.perf_counter() - start,
+    }
+
+def rank(rows):
+    def score(row):
+        if "error" in row:
+            return (1, 0, 0, 0)
+        return (0, -row["sorts_per_hour"], row["false_arrivals"] + row["wrong_station"],
+                row["lap_s"] or float("inf"))
+    return sorted(rows, key=score)
+
+def show(rows, limit):
+    keys = sorted({k for row in rows for k in row["params"]})
+    print("{:>4s} {:>8s} {:>7s} {:>6s} {:>6s} {:>6s}  {}".format(
+        "rank", "sorts/h", "lap s", "sorts", "wrong", "false", "  ".join(keys)))
+    for n, row in enumerate(rows[:limit], 1):
+        params = "  ".join("{}={}".format(k, row["params"].get(k)) for k in keys)
+        if "error" in row:
+            print("{:4d} {:>8s}  {}  {}".format(n, "error", params, row["error"]))
+            continue
+        print("{:4d} {:8.1f} {:>7s} {:6d} {:6d} {:6d}  {}".format(
+            n, row["sorts_per_hour"],
+            "{:.1f}".format(row["lap_s"]) if row["lap_s"] else "-",
+            row["sorts"], row["wrong_station"], row["false_arrivals"], params))
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel config.py sweep on the simulator")
+    parser.add_argument("--grid", action="append", default=[], metavar="KEY=A,B,C",
+                        help="values to try (all combinations unless --range is given)")
+    parser.add_argument("--range", action="append", default=[], metavar="KEY=LO:HI",
+                        help="random search between LO and HI (ints if both are ints)")
+    parser.add_argument("--samples", type=int, default=50, help="random configurations per round")
+    parser.add_argument("--refine", type=int, default=0,
+                        help="extra rounds resampling around the --top best so far")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--minutes", type=float, default=10, help="sim time per run")
+    parser.add_argument("--seeds", type=int, default=1, help="runs per configuration, seeds 0..N-1")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="fixed override for every configuration")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--random-seed", type=int, default=0)
+    parser.add_argument("--show", type=int, default=20, help="rows of the ranked table")
+    parser.add_argument("-o", "--output", help="write all results as JSON (after every round)")
+    args = parser.parse_args()
+
+    grid = parse_grid(args.grid)
+    ranges = parse_ranges(args.range)
+    base = run.parse_overrides(args.set)
+    if not grid and not ranges:
+        parser.error("nothing to sweep: give --grid and/or --range")
+    rng = random.Random(args.random_seed)
+    if ranges:
+        rounds = [random_configs(rng, grid, ranges, args.samples)]
+    else:
+        rounds = [grid_configs(grid)]
+
+    rows = []
+    seen = set()
+    commit = bench_mission.git_commit()
+    with multiprocessing.Pool(args.jobs) as pool:
+        for n in range(1 + (args.refine if ranges else 0)):
+            if n > 0:
+                parents = [row["params"] for row in rank(rows)[:args.top] if "error" not in row]
+                if not parents:
+                    break
+                rounds.append(refined_configs(rng, parents, grid, ranges, args.samples, 0.5 ** (n + 1)))
+            configs = []
+            for config in rounds[n]:
+                if key_of(config) not in seen:
+                    seen.add(key_of(config))
+                    configs.append(config)
+            jobs = [(config, base, args.seeds, args.minutes) for config in configs]
+            start = time.perf_counter()
+            for done, row in enumerate(pool.imap_unordered(evaluate, jobs), 1):
+                rows.append(row)
+                sys.stderr.write("\rround {}: {}/{} configurations ({:.0f} s)".format(
+                    n + 1, done, len(jobs), time.perf_counter() - start))
+            sys.stderr.write("\n")
+            if args.output:
+                with open(args.output, "w") as f:
+                    json.dump({"commit": commit, "base": base, "minutes": args.minutes,
+                               "seeds": args.seeds, "results": rank(rows)}, f, indent=1)
+
+    show(rank(rows), args.show)
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ from pybricks.hubs import EV3Brick
 from pybricks.ev3devices import Motor
 from pybricks.parameters import Port, Button, Color
 from pybricks.tools import wait
+import config
+import homing
 
 # =============================================================================
 # ⚙️ SETTINGS
@@ -52,6 +54,9 @@ while True:
         # MAGIC LINE: This tells the robot "HERE is 0"
         arm_lift.reset_angle(0)
         
+        # Keep it for the next boot too (the clamp still gets a full homing)
+        homing.save(config.HOMING_FILE, {"arm": 0})
+        
         ev3.speaker.say("Zero Saved")
         print("New Zero Position Saved!")
         ev3.light.on(Color.GREEN)
@@ -0,0 +1,306 @@
+# choreography.py
+# Motion sequences as a dependency graph. Every step issues a non-blocking
+# motor command and is polled for completion, so steps that do not depend on
+# each other run at the same time. Each run records per-step start/end times.
+from pybricks.parameters import Stop
+from pybricks.tools import wait, StopWatch
+import config
+
+class Step:
+    """One motion. start() issues the command, done() polls it, finish()
+    runs once it is done. after = steps that must finish before it starts."""
+
+    def __init__(self, name, after=()):
+        self.name = name
+        self.after = after
+        self.started = -1
+        self.finished = -1
+
+    def start(self):
+        pass
+
+    def done(self):
+        return True
+
+    def finish(self):
+        pass
+
+class Call(Step):
+    # Instant action, e.g. robot.stop() or a speech cue
+    def __init__(self, name, fn, after=()):
+        Step.__init__(self, name, after)
+        self.fn = fn
+
+    def start(self):
+        self.fn()
+
+class Poll(Step):
+    """Calls fn() every interval ms (at most) until it returns True, e.g. to
+    read a sensor while motors move."""
+
+    def __init__(self, name, fn, interval=0, after=()):
+        Step.__init__(self, name, after)
+        self.fn = fn
+        self.interval = interval
+        self.watch = StopWatch()
+        self.last = -1
+
+    def start(self):
+        self.watch.reset()
+        self.last = -1
+
+    def done(self):
+        now = self.watch.time()
+        if self.last >= 0 and now - self.last < self.interval:
+            return False
+        self.last = now
+        return self.fn()
+
+class Pause(Step):
+    def __init__(self, name, time_ms, after=()):
+        Step.__init__(self, name, after)
+        self.time_ms = time_ms
+        self.watch = StopWatch()
+
+    def start(self):
+        self.watch.reset()
+
+    def done(self):
+        return self.watch.time() >= self.time_ms
+
+class Target(Step):
+    # motor.run_target(..., wait=False)
+    def __init__(self, name, motor, speed, target, then=Stop.HOLD, after=()):
+        Step.__init__(self, name, after)
+        self.motor = motor
+        self.speed = speed
+        self.target = target
+        self.then = then
+
+    def start(self):
+        self.motor.run_target(self.speed, self.target, then=self.then, wait=False)
+
+    def done(self):
+        return self.motor.control.done()
+
+class Stall(Step):
+    """Non-blocking run_until_stalled: runs at speed with the duty limited
+    until the motor has been (almost) still for config.STALL_TIME ms."""
+
+    def __init__(self, name, motor, speed, duty_limit=None, then=Stop.COAST,
+                 reset_angle=None, after=()):
+        Step.__init__(self, name, after)
+        self.motor = motor
+        self.speed = speed
+        self.duty_limit = duty_limit
+        self.then = then
+        self.reset_angle = reset_angle
+        self.limits = None
+        self.watch = StopWatch()
+        self.still_since = -1
+
+    def start(self):
+        if self.duty_limit is not None:
+            # Limits only change while the controller is stopped (the step
+            # before may have left the motor holding)
+            self.motor.stop()
+            self.limits = self.motor.control.limits()
+            self.motor.control.limits(actuation=self.duty_limit)
+        self.still_since = -1
+        self.watch.reset()
+        self.motor.run(self.speed)
+
+    def done(self):
+        now = self.watch.time()
+        if now < config.STALL_GRACE:
+            return False
+        if abs(self.motor.speed()) > config.STALL_SPEED:
+            self.still_since = -1
+            return False
+        if self.still_since < 0:
+            self.still_since = now
+        return now - self.still_since >= config.STALL_TIME
+
+    def finish(self):
+        # As run_until_stalled: stop, restore the limits, then hold or brake
+        self.motor.stop()
+        if self.limits is not None:
+            self.motor.control.limits(*self.limits)
+            self.limits = None
+        if self.then == Stop.HOLD:
+            self.motor.hold()
+        elif self.then == Stop.BRAKE:
+            self.motor.brake()
+        if self.reset_angle is not None:
+            self.motor.reset_angle(self.reset_angle)
+
+class Straight(Step):
+    # Drives until the odometer has moved by distance mm (sign = direction)
+    def __init__(self, name, robot, speed, distance, after=()):
+        Step.__init__(self, name, after)
+        self.robot = robot
+        self.speed = abs(speed) if distance >= 0 else -abs(speed)
+        self.distance = distance
+        self.origin = 0
+
+    def start(self):
+        self.origin = self.robot.distance()
+        self.robot.drive(self.speed, 0)
+
+    def done(self):
+        return abs(self.robot.distance() - self.origin) >= abs(self.distance)
+
+    def finish(self):
+        self.robot.stop()
+
+class Turn(Step):
+    # Turns in place until the heading has changed by angle degrees
+    def __init__(self, name, robot, turn_rate, angle, after=()):
+        Step.__init__(self, name, after)
+        self.robot = robot
+        self.turn_rate = abs(turn_rate) if angle >= 0 else -abs(turn_rate)
+        self.angle = angle
+        self.origin = 0
+
+    def start(self):
+        self.origin = self.robot.angle()
+        self.robot.drive(0, self.turn_rate)
+
+    def done(self):
+        return abs(self.robot.angle() - self.origin) >= abs(self.angle)
+
+    def finish(self):
+        self.robot.stop()
+
+class Seek(Step):
+    """Drives straight until found() is true or distance mm (sign =
+    direction) have been covered; hit says which."""
+
+    def __init__(self, name, robot, speed, distance, found, after=()):
+        Step.__init__(self, name, after)
+        self.robot = robot
+        self.speed = abs(speed) if distance >= 0 else -abs(speed)
+        self.distance = distance
+        self.found = found
+        self.origin = 0
+        self.hit = False
+
+    def start(self):
+        self.origin = self.robot.distance()
+        self.hit = False
+        self.robot.drive(self.speed, 0)
+
+    def done(self):
+        if self.found():
+            self.hit = True
+            return True
+        return abs(self.robot.distance() - self.origin) >= abs(self.distance)
+
+    def finish(self):
+        self.robot.stop()
+
+class Approach(Step):
+    """Drives until the (median filtered) ultrasonic distance has been stop_mm
+    or less for config.OBSTACLE_CONFIRM reads in a row, or until max_distance
+    mm have been covered (nothing there). detector: an obstacle.ObstacleDetector."""
+
+    def __init__(self, name, robot, detector, speed, stop_mm, max_distance, after=()):
+        Step.__init__(self, name, after)
+        self.robot = robot
+        self.detector = detector
+        self.speed = speed
+        self.stop_mm = stop_mm
+        self.max_distance = max_distance
+        self.origin = 0
+        self.close = 0
+
+    def start(self):
+        self.origin = self.robot.distance()
+        self.close = 0
+        self.detector.reset()
+        self.robot.drive(self.speed, 0)
+
+    def done(self):
+        if self.robot.distance() - self.origin >= self.max_distance:
+            return True
+        if self.detector.read() > self.stop_mm:
+            self.close = 0
+            return False
+        self.close += 1
+        return self.close >= config.OBSTACLE_CONFIRM
+
+    def finish(self):
+        self.robot.stop()
+
+class Reach(Step):
+    """Drives the filtered ultrasonic distance measured at the start, less
+    reach mm, so the object ends up that far ahead of the sensor (at most
+    max_distance; the sensor is unreliable that close, so no polling)."""
+
+    def __init__(self, name, robot, detector, speed, reach, max_distance, after=()):
+        Step.__init__(self, name, after)
+        self.robot = robot
+        self.detector = detector
+        self.speed = speed
+        self.reach = reach
+        self.max_distance = max_distance
+        self.origin = 0
+        self.distance = 0
+
+    def start(self):
+        self.distance = max(0, min(self.max_distance, self.detector.read() - self.reach))
+        self.origin = self.robot.distance()
+        self.robot.drive(self.speed, 0)
+
+    def done(self):
+        return self.robot.distance() - self.origin >= self.distance
+
+    def finish(self):
+        self.robot.stop()
+
+class Choreography:
+    def __init__(self, name):
+        self.name = name
+        self.steps = []
+        self.watch = StopWatch()
+        self.total = 0
+
+    def add(self, step):
+        self.steps.append(step)
+        return step
+
+    def run(self):
+        for step in self.steps:
+            step.started = -1
+            step.finished = -1
+        self.watch.reset()
+        pending = list(self.steps)
+        running = []
+        while pending or running:
+            for step in list(pending):
+                ready = True
+                for dep in step.after:
+                    if dep.finished < 0:
+                        ready = False
+                        break
+                if ready:
+                    pending.remove(step)
+                    step.started = self.watch.time()
+                    step.start()
+                    running.append(step)
+            for step in list(running):
+                if step.done():
+                    step.finish()
+                    step.finished = self.watch.time()
+                    running.remove(step)
+            if running:
+                wait(config.CHOREO_POLL)
+        self.total = self.watch.time()
+        if config.CHOREO_REPORT:
+            self.report()
+        return self.total
+
+    def report(self):
+        print("[{}] {} ms".format(self.name, self.total))
+        for step in self.steps:
+            print("  {:<14} {:>5} -> {:>5} ms".format(step.name, step.started, step.finished))
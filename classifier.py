@@ -0,0 +1,76 @@
+# classifier.py
+# config.TRASH_DB compiled into a lookup table indexed by (color code,
+# reflection), plus sequential voting over several clamp sensor samples that
+# stops as soon as the vote is decided.
+import config
+import sensing
+
+class TrashClassifier:
+    """labels[0] is "None" (empty clamp), labels[1] "Others" (no DB match),
+    then one label per material in TRASH_DB order (first match wins)."""
+
+    def __init__(self, db=None):
+        if db is None:
+            db = config.TRASH_DB
+        self.labels = ["None", "Others"]
+        size = len(sensing.COLORS) * sensing.REFL_STEPS
+        self.table = bytearray([1]) * size
+        for code in range(len(sensing.COLORS)):
+            base = code * sensing.REFL_STEPS
+            for ref in range(config.TRASH_NONE_MAX + 1):
+                self.table[base + ref] = 0
+        for name, lo, hi, colors in db:
+            if name not in self.labels:
+                self.labels.append(name)
+            label = self.labels.index(name)
+            for color in colors:
+                base = sensing.color_code(color) * sensing.REFL_STEPS
+                for ref in range(max(lo, config.TRASH_NONE_MAX + 1), min(hi, 100) + 1):
+                    if self.table[base + ref] == 1:
+                        self.table[base + ref] = label
+        self.votes = [0] * len(self.labels)
+        self.samples = 0
+
+    def classify(self, code, reflection):
+        return self.labels[self.table[code * sensing.REFL_STEPS + reflection]]
+
+    def reset(self):
+        for i in range(len(self.votes)):
+            self.votes[i] = 0
+        self.samples = 0
+
+    def add(self, code, reflection):
+        # Counts one sample; returns True once more samples cannot change the result
+        self.votes[self.table[code * sensing.REFL_STEPS + reflection]] += 1
+        self.samples += 1
+        return self.decided()
+
+    def decided(self):
+        n = self.samples
+        if n >= config.ID_MAX_SAMPLES:
+            return True
+        lead, second = self._top_two()
+        if n >= config.ID_MIN_SAMPLES and self.votes[lead] * 100 >= n * config.ID_CONFIDENCE:
+            return True
+        # The runner-up could not catch up even if it won every remaining sample
+        return self.votes[lead] - self.votes[second] > config.ID_MAX_SAMPLES - n
+
+    def result(self):
+        # (label, confidence %, samples used)
+        if self.samples == 0:
+            return "None", 0, 0
+        lead = self._top_two()[0]
+        return self.labels[lead], self.votes[lead] * 100 // self.samples, self.samples
+
+    def _top_two(self):
+        lead = 0
+        second = 1
+        if self.votes[1] > self.votes[0]:
+            lead, second = 1, 0
+        for i in range(2, len(self.votes)):
+            if self.votes[i] > self.votes[lead]:
+                second = lead
+                lead = i
+            elif self.votes[i] > self.votes[second]:
+                second = i
+        return lead, second
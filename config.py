@@ -4,18 +4,102 @@ from pybricks.parameters import Color
 # --- DRIVE SETTINGS ---
 THRESHOLD = 54       
 DRIVE_SPEED = 50    
-TURN_GAIN = -1.2    # <--- CHANGED to -1.2 for stricter following
 BLACK_REFL_THRESHOLD = 20
+LOOP_PERIOD = 25    # ms per control tick: color() + reflection() take ~22 ms (the
+                    # per-tick gains and counts below are scaled for this rate)
+
+# --- PID LINE FOLLOWER (see pid.py) ---
+# (speed mm/s, kp, ki, kd) in 1/1000, per control tick; rows are interpolated
+# by the current speed. The default is the P-only follower proven on the mat.
+PID_GAINS = [(50, -1200, 0, 0)]
+# Fitted by tools/tune_pid.py on the simulated track, where it holds the line
+# up to 140 mm/s (P-only loses it above ~110). Not yet checked on the real
+# track: opt in with PID_GAINS = PID_GAINS_FITTED.
+PID_GAINS_FITTED = [(50, -950, 0, -900), (80, -1300, -8, 0), (110, -1300, -18, -3200), (140, -1700, -23, -4000)]
+PID_I_LIMIT = 200   # cap on the summed error (error x ticks) against windup
+PID_D_FILTER = 82   # % of each new derivative taken per tick (100 = no filtering)
+
+# --- LOOP MEMORY (see memory.py) ---
+# The mission loop runs with automatic GC off; the heap is collected at stops
+GC_MIN_FREE = 64 * 1024  # force a collection while driving below this many free bytes
+GC_CHECK_TICKS = 20      # ticks between free heap checks
+BUTTON_POLL_TICKS = 4    # ticks between stop button polls (pressed() allocates a list)
+TICK_LOG = False         # print "Color | Ref | Dist" every tick (builds a string per tick)
+
+# --- LINE SENSOR (see sensing.py) ---
+# False: color() + reflection() every tick, the modes THRESHOLD,
+# WHITE_THRESHOLD, BLACK_REFL_THRESHOLD and the station windows were measured
+# in. True: one rgb() read per tick (no mode switches), with the color class
+# and reflection derived by the RGB_* settings below - only once those have
+# been fitted from data_logger.py dumps with tools/calibrate.py --fit-rgb;
+# the tick then fits in LOOP_PERIOD = 10, with the per-tick values scaled back.
+LINE_RGB = False
+# Placeholders until fitted: reflection = red channel, textbook hue bands
+RGB_REFL_WEIGHTS = (100, 0, 0)  # % of R, G, B that make up the reflection
+RGB_NONE_MAX = 1                # brightest channel <= this -> no color
+RGB_BLACK_MAX = 10              # brightest channel < this -> BLACK
+RGB_WHITE_MIN = 40              # unsaturated and at least this bright -> WHITE
+RGB_MIN_SATURATION = 35         # chroma as % of brightest channel
+RGB_BROWN_MAX = 25              # dim red/yellow reads as BROWN
+# (hue upper bound, color code) - codes as in sensing.COLORS
+RGB_HUE_BANDS = [(40, 5), (75, 4), (170, 3), (280, 2), (360, 5)]
+
+# --- TRACK MAP (see trackmap.py) ---
+TRACK_MAP_FILE = "trackmap.txt"  # learned on the first lap; delete it when the track changes
+CRUISE_SPEED = 80       # between landmarks once the map is known (= DRIVE_SPEED: off)
+MAP_WINDOW_BEFORE = 200 # mm before an expected corner/station where DRIVE_SPEED resumes
+MAP_WINDOW_AFTER = 100  # ... and after it
+MAP_SNAP = 250          # a corner this close to a mapped one is taken to be it
+MAP_MIN_GAP = 150       # station events closer than this to the last landmark are ignored
+# Landmarks in lap order from station 1 (S station, C corner), see info.txt; a
+# learned lap that does not match is thrown away and learned again (None: any)
+TRACK_LAYOUT = "SSSCCCC"
+
+# --- POSITION ESTIMATE (see position.py) ---
+ODOMETRY_DRIFT = 30       # per mille of the distance since the last landmark
+POSITION_TOLERANCE = 150  # mm (+ drift) a pad may be from the mapped station it is taken for
+
+# --- ADAPTIVE SPEED (see speed.py) ---
+# Speed follows the recent steering error, up to the track map's speed
+ADAPTIVE_SPEED = False  # slower than the fixed map speeds in the sim so far
+SPEED_MIN = 50          # mm/s in the tightest curves (below DRIVE_SPEED it loses the line)
+SPEED_WINDOW = 6        # ticks of |ref - THRESHOLD| averaged
+SPEED_ERR_LOW = 8       # mean error at or below this: straight, full speed
+SPEED_ERR_HIGH = 22     # mean error at or above this: curve, SPEED_MIN
+SPEED_MAX_ERROR = 35    # one tick this far off the edge: SPEED_MIN right away
+SPEED_ACCEL = 150       # mm/s per second when speeding up
+SPEED_DECEL = 600       # mm/s per second when slowing down
+
+# --- OBSTACLE DETECTION (see obstacle.py) ---
+OBSTACLE_WINDOW = 5       # ultrasonic readings in the median (odd)
+OBSTACLE_CONFIRM = 5      # filtered reads in a row inside the distance before it counts
+OBSTACLE_NEAR = 50        # mm, filtered: stop and pick up below this
+OBSTACLE_CLEAR = 80       # mm: near is only cleared again above this
+OBSTACLE_SLOW = 200       # mm: brake towards APPROACH_SPEED from here while closing in
+OBSTACLE_RATE_TICKS = 4   # ticks the closing rate is measured over
 
 # --- CORNER LOGIC ---
 WHITE_THRESHOLD = 85 
-VALID_WHITE_DIST = 50   
-CORNER_COOLDOWN = 200   
+VALID_WHITE_DIST = 50   # mm of white that make a corner
+CORNER_COOLDOWN = 200   # mm after a corner before the next can start
 
 # --- STATION LOGIC ---
-CONFIRM_THRESHOLD = 3
+CONFIRM_THRESHOLD = 3       # (tick count, before STATION_CONFIRM_MM)
+STATION_CONFIRM_MM = 2      # pad color must hold over this much travel ...
+STATION_MIN_SAMPLES = 2     # ... and this many reads (one glitch is not a pad)
+# Blind distance after leaving station 1, 2, 3 (was 5 s / 1 s / 1 s of
+# DRIVE_SPEED, which shrank or grew with the speed)
+STATION_COOLDOWN_MM = [250, 50, 50]
 SLOW_PACE = 30  
 
+# --- MISSED STATIONS (see position.CornerCheckpoint) ---
+# Corners between the previous station and station 1, 2, 3 (info.txt: four
+# from station 3 round to station 1, none on the station side)
+CORNERS_BEFORE = [4, 0, 0]
+START_CORNERS = 3       # corners from the start position to station 1
+RECOVER_REVERSE = 250   # mm to back up looking for a missed station we carry for (0: off)
+RECOVER_SPEED = 60      # mm/s
+
 # --- ARM & CLAMP SETTINGS ---
 ARM_SPEED = 200
 ARM_SAFE_POS = -270
@@ -24,6 +108,48 @@ CLAMP_SPEED = 200
 CLAMP_FORCE = 72
 CLAMP_OPEN_ANGLE = 70
 
+# --- FAST BOOT (see homing.py) ---
+FAST_BOOT = True
+HOMING_FILE = "homing.txt"  # motor angles at the last clean shutdown
+HOMING_TOLERANCE = 8        # deg the clamp may move in the boot check before a full homing
+
+# --- CHOREOGRAPHY (non-blocking motions, see choreography.py) ---
+CHOREO_POLL = 5        # ms between completion polls
+CHOREO_REPORT = True   # print per-step timings after every sequence
+STALL_SPEED = 20       # deg/s below which a motor counts as stalled
+STALL_TIME = 60        # ms it must stay stalled
+STALL_GRACE = 150      # ms after start before stall detection begins
+APPROACH_SPEED = 30
+APPROACH_MAX = 60      # mm, longest pick approach (was 1 s at 30 mm/s)
+PICK_REACH = 20        # mm, ultrasonic distance left when the clamp closes
+
+# --- UNLOAD ---
+UNLOAD_TURN = 150          # deg, turn from the line to the bin (and back)
+UNLOAD_TURN_RATE = 90      # deg/s
+UNLOAD_SPEED = 30          # mm/s towards the bin
+UNLOAD_BIN_DIST = 60       # mm, ultrasonic stop distance
+UNLOAD_APPROACH_MAX = 400  # mm, give up the ultrasonic approach after this
+UNLOAD_NUDGE = 90          # mm past the ultrasonic stop (was 3 s at 30 mm/s)
+UNLOAD_REVERSE = 150       # mm
+UNLOAD_REVERSE_SPEED = 100
+
+# --- SPEECH ---
+SPEECH_QUEUE_SIZE = 3   # pending announcements before the oldest is dropped
+SPEECH_CACHE = True     # play pre-rendered .wav files instead of live espeak
+SPEECH_CACHE_DIR = "speech_cache"
+SPEECH_CACHE_VERSION = 1  # bump to force every phrase to be rendered again
+SPEECH_LANGUAGE = "en"
+SPEECH_VOICE = None
+SPEECH_SPEED = 175
+SPEECH_PITCH = 50
+
+# --- TRASH IDENTIFICATION (see classifier.py) ---
+TRASH_NONE_MAX = 6      # clamp reflection at or below this = empty clamp
+ID_MIN_SAMPLES = 2      # never decide on fewer samples
+ID_MAX_SAMPLES = 5      # the old majority vote used 5
+ID_CONFIDENCE = 100     # % of votes for the leader that ends sampling early
+ID_SAMPLE_GAP = 20      # ms between samples
+
 # --- TRASH DATABASE ---
 TRASH_DB = [
     # Plastic -> Station 1 (Red)
@@ -32,8 +158,14 @@ TRASH_DB = [
     ("Paper",   21, 100, [Color.WHITE, Color.BLUE])
 ]
 
+# --- ROUTING ---
+# Station each material is dropped at (station id = position in STATIONS + 1)
+STATION_FOR = {"Plastic": 1, "Others": 2, "Paper": 3}
+SKIP_STOP = True        # roll past stations that are not the held item's target
+
 # --- STATION NAMES ---
 STATION_SEQUENCE = ["Red Station (Plastic)", "Blue Station (Other)", "Orange Station (Paper)"]
+STATION_ANNOUNCE = ["Plastic Station", "Other Station", "Paper Station"]
 
 # --- STATION CALIBRATION ---
 
@@ -50,4 +182,42 @@ STATION_2_MAX = 40
 # Station 3: Orange (Paper)
 STATION_3_COLOR = [Color.RED]
 STATION_3_MIN = 30
-STATION_3_MAX = 100
\ No newline at end of file
+STATION_3_MAX = 100
+
+# --- TELEMETRY (per-event binary log, decoded by tools/telemetry_dump.py) ---
+TELEMETRY = True
+TELEMETRY_FILE = "telemetry.bin"
+TELEMETRY_RECORDS = 256  # buffered events (14 bytes each) between writes
+
+# --- TRACE (sensor/motor recording, replayed by sim/replay.py) ---
+TRACE = False
+TRACE_FILE = "trace.txt"
+TRACE_FLUSH = 100      # records buffered between file writes
+
+# --- GENERATED CALIBRATION ---
+# tools/calibrate.py writes calibration.py from labeled sensor dumps; its
+# STATION_n_* / TRASH_DB (and, with --fit-rgb, RGB_*) values replace the
+# hand-tuned ones above.
+try:
+    from calibration import *
+except ImportError:
+    pass
+
+# All stations in route order (station id = position + 1): (colors, min ref, max ref)
+STATIONS = [
+    (STATION_1_COLOR, STATION_1_MIN, STATION_1_MAX),
+    (STATION_2_COLOR, STATION_2_MIN, STATION_2_MAX),
+    (STATION_3_COLOR, STATION_3_MIN, STATION_3_MAX),
+]
+
+# Per-station lists are indexed by station id - 1: one entry per station
+for _name, _per_station in (("STATION_ANNOUNCE", STATION_ANNOUNCE),
+                            ("STATION_COOLDOWN_MM", STATION_COOLDOWN_MM),
+                            ("CORNERS_BEFORE", CORNERS_BEFORE)):
+    if len(_per_station) != len(STATIONS):
+        raise ValueError("config.{} has {} entries for {} STATIONS".format(
+            _name, len(_per_station), len(STATIONS)))
+for _station in STATION_FOR.values():
+    if not 1 <= _station <= len(STATIONS):
+        raise ValueError("config.STATION_FOR names station {}, not in STATIONS".format(_station))
+del _name, _per_station, _station
@@ -44,7 +44,7 @@ while True:
     ev3.speaker.beep()
     ev3.light.on(Color.GREEN)
     print("\n--- NEW RECORDING ---")
-    print("Color Code | Refl | Amb")
+    print("Color Code | Refl | Amb | R | G | B")
     
     while True:
         # 1. Check if user wants to STOP
@@ -57,10 +57,12 @@ while True:
         c = line_sensor.color()
         r = line_sensor.reflection()
         a = line_sensor.ambient()
+        # Same spot in RGB mode, for fitting the RGB_* settings (tools/calibrate.py --fit-rgb)
+        red, green, blue = line_sensor.rgb()
         
         # 3. Print Data
-        # Format: Color(12 chars) | Refl(4 chars) | Amb(4 chars)
-        print("{:<12} | {:<4} | {:<4}".format(str(c), r, a))
+        # Format: Color(12 chars) | Refl(4 chars) | Amb(4 chars) | R | G | B
+        print("{:<12} | {:<4} | {:<4} | {:<4} | {:<4} | {:<4}".format(str(c), r, a, red, green, blue))
         
         wait(200) # 5 readings per second
         
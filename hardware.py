@@ -20,4 +20,10 @@ clamp_sensor = ColorSensor(Port.S2)         # Port 2
 line_sensor = ColorSensor(Port.S3)          # Port 3
 
 # Initialize DriveBase
-robot = DriveBase(left_motor, right_motor, wheel_diameter=56, axle_track=114)
\ No newline at end of file
+robot = DriveBase(left_motor, right_motor, wheel_diameter=56, axle_track=114)
+
+# Optional recording of every device call (tracing.py)
+import config
+if config.TRACE:
+    import tracing
+    tracing.attach(globals())
@@ -0,0 +1,35 @@
+# homing.py
+# Motor zeroes kept across restarts. park_and_shutdown() leaves the arm down
+# and the clamp stalled shut, then writes both angles to config.HOMING_FILE;
+# the motors power up reading 0 in that same pose, so the next boot restores
+# the angles from the file and only checks the clamp against its closed stop
+# instead of stalling it fully open and shut. load() deletes the file: after
+# a crash (motors left anywhere) there is none and the full homing runs.
+import os
+
+def load(path):
+    # {"arm": angle, "clamp": angle} as saved, or None
+    if path is None:
+        return None
+    angles = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and not parts[0].startswith("#"):
+                    angles[parts[0]] = int(parts[1])
+    except (OSError, ValueError):
+        return None
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return angles or None
+
+def save(path, angles):
+    if path is None:
+        return
+    with open(path, "w") as f:
+        f.write("# motor angles at the last clean shutdown\n")
+        for name in angles:
+            f.write("{} {}\n".format(name, int(angles[name])))
@@ -0,0 +1,50 @@
+# landmarks.py
+# Corner and station confirmation by distance travelled instead of ticks and
+# timers: the condition (white patch, station pad color) must hold over
+# confirm_mm of robot.distance(), and after firing the trigger stays blind for
+# cooldown_mm. Ticks and milliseconds cover more track the faster the robot
+# goes; millimetres do not, so detection is the same at any cruise speed.
+
+class DistanceTrigger:
+    """update() once per tick; True on the tick the landmark is confirmed.
+    min_samples: matching reads needed as well, so a single glitch cannot
+    confirm when one tick covers more than confirm_mm."""
+
+    def __init__(self, confirm_mm, cooldown_mm=0, min_samples=1):
+        self.confirm_mm = confirm_mm
+        self.cooldown_mm = cooldown_mm
+        self.min_samples = min_samples
+        self.samples = 0       # consecutive matching reads so far
+        self.start = 0         # odometer where they began
+        self.cooling = False
+        self.blind_from = 0    # odometer where the cooldown began
+        self.blind_mm = 0
+
+    def update(self, matching, dist):
+        if self.cooling:
+            if dist - self.blind_from < self.blind_mm:
+                self.samples = 0
+                return False
+            self.cooling = False
+        if not matching:
+            self.samples = 0
+            return False
+        if self.samples == 0:
+            self.start = dist
+        self.samples += 1
+        if self.samples >= self.min_samples and dist - self.start >= self.confirm_mm:
+            self.hold_off(dist, self.cooldown_mm)
+            return True
+        return False
+
+    def hold_off(self, dist, cooldown_mm):
+        # Blind for the next cooldown_mm from dist
+        self.samples = 0
+        self.cooling = cooldown_mm > 0
+        self.blind_from = dist
+        self.blind_mm = cooldown_mm
+
+    def odometer_reset(self, dist):
+        # robot.reset() was called at odometer reading dist
+        self.start -= dist
+        self.blind_from -= dist
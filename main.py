@@ -1,14 +1,32 @@
 #!/usr/bin/env pybricks-micropython
-from pybricks.parameters import Button, Color
-from pybricks.tools import wait, StopWatch
+from pybricks.parameters import Button
+from pybricks.tools import StopWatch
+boot_timer = StopWatch()  # time-to-ready includes the imports and device setup
 import config
 import hardware
+import speech
 import actions
+import landmarks
+import memory
+import obstacle
+import pid
+import position
+import sensing
+import speed
+import scheduler
+import stations
+import telemetry
+import trackmap
+import tracing
 
 # --- MAIN EXECUTION ---
+ticker = scheduler.TickScheduler(config.LOOP_PERIOD)
+heap = memory.HeapManager(config.GC_MIN_FREE, config.GC_CHECK_TICKS)
+locator = None  # position.PositionEstimator, built with the mission state below
+
 try:
     # 1. INITIALIZE
-    actions.initialize_robot()
+    actions.initialize_robot(boot_timer)
     
     # 2. START IMMEDIATELY
     mission_timer = StopWatch()
@@ -16,132 +34,204 @@ try:
     
     # Map & State Variables
     next_station = 1
-    corners_passed = 0
-    stn1_required_corners = 3 
-    
-    # Detection Variables
-    white_start_dist = -1
-    last_corner_finish_dist = -200
-    station_consecutive_count = 0
+    # 🆕 corners between stations, checked against the layout
+    checkpoint = position.CornerCheckpoint(len(config.STATIONS))
     
-    # 🆕 DYNAMIC COOLDOWN SETUP
-    station_departure_time = -5000 
-    current_cooldown = 1000  # Default 1s
+    # Detection Variables: 🆕 confirmed and cooled down by distance (landmarks.py)
+    corner_trigger = landmarks.DistanceTrigger(config.VALID_WHITE_DIST, config.CORNER_COOLDOWN)
+    corner_heading = 0  # robot.angle() where the current white run began
+    station_trigger = landmarks.DistanceTrigger(config.STATION_CONFIRM_MM,
+                                                min_samples=config.STATION_MIN_SAMPLES)
+    station_departure_time = telemetry.now()  # mission start, on the telemetry clock
     
     # Trash State
     held_item = "None" 
+    target_station = 0  # station for held_item (config.STATION_FOR), 0 = none
+    
+    # Line sensor: one sample per tick (color()+reflection(), or rgb() with LINE_RGB)
+    line = sensing.ColorSampler(hardware.line_sensor)
+    station_table = stations.StationTable(config.STATIONS)
+    track = trackmap.TrackMap(config.TRACK_MAP_FILE)
+    locator = position.PositionEstimator(track, checkpoint)  # 🆕 which station a pad is
+    speeder = speed.SpeedScheduler(config.LOOP_PERIOD)
+    steer = pid.PID(config.PID_GAINS, config.PID_I_LIMIT, config.PID_D_FILTER)
+    
+    # Steady-state ticks allocate nothing: integer PID steering, button
+    # polled every few ticks, per-tick log off unless config.TICK_LOG
+    button_countdown = config.BUTTON_POLL_TICKS
     
     print("--- MISSION STARTED ---")
-    print("Format: Color | Reflection | Object Distance")
+    if config.TICK_LOG:
+        print("Format: Color | Reflection | Object Distance")
+    ticker.start()
+    telemetry.start(actions.trash_classifier.labels, actions.ready_ms)
+    heap.start()
 
     while True:
-        if Button.CENTER in hardware.ev3.buttons.pressed(): break
+        button_countdown -= 1
+        if button_countdown <= 0:
+            button_countdown = config.BUTTON_POLL_TICKS
+            if Button.CENTER in hardware.ev3.buttons.pressed(): break
         
         # 1. READ SENSORS
-        col = hardware.line_sensor.color()
-        ref = hardware.line_sensor.reflection()
+        line.read()
+        col = line.color
+        ref = line.reflection
         curr_dist = hardware.robot.distance()
-        obj_dist = hardware.obstacle_sensor.distance() 
+        track.advance(curr_dist)
+        obj_dist = obstacle.detector.read()  # 🆕 median filtered
         
         # 🔍 DEBUG LOGS
-        print(str(col) + " | Ref: " + str(ref) + " | Dist: " + str(obj_dist))
+        if config.TICK_LOG:
+            print(str(col) + " | Ref: " + str(ref) + " | Dist: " + str(obj_dist))
         
-        # 2. ULTRASONIC OBJECT DETECTION
-        if obj_dist < 50 and held_item == "None":
+        # 2. ULTRASONIC OBJECT DETECTION (with hysteresis, see obstacle.py)
+        if obstacle.detector.near and held_item == "None":
             print(">>> OBJECT DETECTED: " + str(obj_dist) + "mm")
             held_item, trash_col, trash_ref = actions.pick_and_drop()
+            target_station = config.STATION_FOR.get(held_item, 0)
+            tracing.decision("pickup", held_item)
+            picked_dist = hardware.robot.distance()
+            track.advance(picked_dist)  # the pick approach counts too
             hardware.robot.reset()
-            last_corner_finish_dist = -200
+            track.odometer_reset()
+            corner_trigger.odometer_reset(picked_dist)
+            station_trigger.odometer_reset(picked_dist)
+            obstacle.detector.reset()
             print(">>> HOLDING: " + held_item)
+            heap.collect()
+            speeder.reset()
+            steer.reset()
+            ticker.resync()
 
         # 3. STRICT LINE FOLLOWING
-        turn_rate = (ref - config.THRESHOLD) * config.TURN_GAIN
-        current_speed = config.DRIVE_SPEED
+        current_speed = track.speed()  # 🆕 cruise between mapped landmarks
+        if config.ADAPTIVE_SPEED:
+            # 🆕 ... and slow down in curves
+            current_speed = speeder.update(ref - config.THRESHOLD, current_speed)
+        if held_item == "None":
+            current_speed = obstacle.detector.speed_limit(current_speed)  # 🆕 brake before objects
+        turn_rate = steer.update(ref - config.THRESHOLD, current_speed)  # 🆕 PID, gains by speed
         
-        # 4. CORNER COUNTING
-        if (curr_dist - last_corner_finish_dist > config.CORNER_COOLDOWN):
-            if ref > config.WHITE_THRESHOLD:
-                if white_start_dist == -1: white_start_dist = curr_dist 
-                if (curr_dist - white_start_dist) >= config.VALID_WHITE_DIST:
-                    corners_passed += 1
-                    hardware.ev3.speaker.beep()
-                    last_corner_finish_dist = curr_dist
-                    white_start_dist = -1 
-                    print("\n[#] CORNER {} DETECTED\n".format(corners_passed))
-            else:
-                white_start_dist = -1 
+        # 4. CORNER COUNTING (white over VALID_WHITE_DIST mm)
+        recovered = False
+        corner_seen = corner_trigger.update(ref > config.WHITE_THRESHOLD, curr_dist)
+        if corner_trigger.samples == 1:
+            corner_heading = hardware.robot.angle()  # 🆕 where the white began
+        if corner_seen:
+            expected = checkpoint.corner(next_station)
+            speech.beep()
+            tracing.decision("corner", checkpoint.corners)
+            track.corner()
+            print("\n[#] CORNER {} DETECTED\n".format(checkpoint.corners))
+            
+            # 🆕 CHECKPOINT: a corner too many, the expected station is behind us
+            if checkpoint.missed:
+                print(">>> MISSED STATION: " + str(checkpoint.missed))
+                tracing.decision("missed", checkpoint.missed)
+                recover_ms = 0
+                if checkpoint.missed == target_station and checkpoint.corners == 1 and \
+                        config.RECOVER_REVERSE > 0:
+                    # Only just past it: back up onto the pad instead of a lap
+                    recover_start = mission_timer.time()
+                    recovered = actions.recover_station(
+                        lambda: station_table.rows[target_station][line.read().cell] == 1,
+                        hardware.robot.angle() - corner_heading)
+                    recover_ms = mission_timer.time() - recover_start
+                    curr_dist = hardware.robot.distance()
+                    track.advance(curr_dist)
+                    steer.reset()
+                    ticker.resync()
+                telemetry.log(telemetry.MISSED, duration=recover_ms, station=checkpoint.missed,
+                              item=actions.trash_classifier.labels.index(held_item))
+                next_station = checkpoint.missed if recovered else expected
 
-        # 5. STATION IDENTIFICATION (Dynamic Cooldown)
-        is_matching = False
-        time_since_departure = mission_timer.time() - station_departure_time
-        
-        # 🆕 USE VARIABLE COOLDOWN (1s or 3s)
-        if time_since_departure > current_cooldown:
-            is_matching = actions.check_station(next_station, col, ref)
-        
-        if is_matching:
-            station_consecutive_count += 1
+        # 5. STATION IDENTIFICATION (any pad color over STATION_CONFIRM_MM,
+        # blind for STATION_COOLDOWN_MM after the last station)
+        pad = station_table.ids[line.cell]
+        arrived = station_trigger.update(pad, curr_dist) or recovered
+        if station_trigger.samples or arrived:
             turn_rate = 0 
-        else:
-            station_consecutive_count = 0
+            # 🆕 Slow down only on a pad we may stop at
+            if target_station in pad:
+                current_speed = config.SLOW_PACE
+        if arrived:
+            # 🆕 Which station by position on the track map (1 and 3 are
+            # both red), not just the next one in the sequence
+            found = locator.station(pad, next_station)
+            if locator.missed:
+                # 🆕 CHECKPOINT: the pad of a later station, the expected one was missed
+                print(">>> MISSED STATION: " + str(locator.missed))
+                tracing.decision("missed", locator.missed)
+                telemetry.log(telemetry.MISSED, station=locator.missed,
+                              item=actions.trash_classifier.labels.index(held_item))
+            if found == 0:
+                arrived = False
+                station_trigger.hold_off(curr_dist, config.MAP_MIN_GAP)
+            elif found != next_station:
+                tracing.decision("resync", found)
+                next_station = found
             
         # 6. STATION ARRIVAL
-        if station_consecutive_count >= 3:
-            hardware.robot.stop()
-            print(">>> ARRIVED AT STATION: " + str(next_station))
-            
-            # A. ANNOUNCE
-            if next_station == 1:
-                hardware.ev3.speaker.say("Plastic Station")
-            elif next_station == 2:
-                hardware.ev3.speaker.say("Other Station")
-            elif next_station == 3:
-                hardware.ev3.speaker.say("Paper Station")
-            
-            # B. DROP LOGIC
-            should_drop = False
-            if next_station == 1 and held_item == "Plastic": should_drop = True
-            if next_station == 2 and held_item == "Others": should_drop = True
-            if next_station == 3 and held_item == "Paper": should_drop = True
-            
-            if should_drop:
-                print(">>> DROPPING ITEM: " + held_item)
-                hardware.ev3.speaker.say("Dropping")
-                actions.unload_sequence() 
-                held_item = "None"
-            else:
-                print(">>> KEEPING ITEM (Wrong Station)")
-                hardware.ev3.speaker.beep()
-            
-            # C. UPDATE MAP & SET COOLDOWN
-            if next_station == 1: 
-                next_station = 2
-                corners_passed = 0 
-                # 🆕 Leaving Plastic Station -> Wait 3 Seconds
-                current_cooldown = 5000 
-                print(">>> COOLDOWN SET: 5 Seconds")
+        if arrived:
+            stopping = next_station == target_station or not config.SKIP_STOP
+            if stopping:
+                hardware.robot.stop()
+                print(">>> ARRIVED AT STATION: " + str(next_station))
+                tracing.decision("arrive", next_station)
+                telemetry.log(telemetry.ARRIVE, duration=telemetry.now() - station_departure_time,
+                              station=next_station,
+                              item=actions.trash_classifier.labels.index(held_item))
                 
-            elif next_station == 2: 
-                next_station = 3
-                corners_passed = 0
-                current_cooldown = 1000 # Normal 1s
+                # A. ANNOUNCE
+                speech.say(config.STATION_ANNOUNCE[next_station - 1])
                 
-            elif next_station == 3: 
-                next_station = 1
-                corners_passed = 0
-                current_cooldown = 1000 # Normal 1s
+                # B. DROP LOGIC
+                if next_station == target_station:
+                    print(">>> DROPPING ITEM: " + held_item)
+                    speech.say("Dropping")
+                    unload_ms = actions.unload_sequence() 
+                    obstacle.detector.reset()  # the unload approach read the bin
+                    tracing.decision("drop", held_item)
+                    telemetry.log(telemetry.DROP, duration=unload_ms, station=next_station,
+                                  item=actions.trash_classifier.labels.index(held_item))
+                    held_item = "None"
+                    target_station = 0
+                else:
+                    print(">>> KEEPING ITEM (Wrong Station)")
+                    speech.beep()
+            else:
+                # 🆕 SKIP-STOP: not our station, roll past and only advance the map
+                print(">>> PASSING STATION: " + str(next_station))
+                tracing.decision("pass", next_station)
+                telemetry.log(telemetry.PASS, duration=telemetry.now() - station_departure_time,
+                              station=next_station,
+                              item=actions.trash_classifier.labels.index(held_item))
+            
+            # C. UPDATE MAP & SET COOLDOWN (🆕 in mm, see STATION_COOLDOWN_MM)
+            cooldown_mm = config.STATION_COOLDOWN_MM[next_station - 1]
+            next_station = next_station % len(config.STATIONS) + 1
+            checkpoint.station(next_station)
             
-            # D. RESET & DEPART
-            station_departure_time = mission_timer.time()
-            station_consecutive_count = 0
-            white_start_dist = -1
+            # D. RESET & DEPART (when stopped: a good time for the file write)
+            if stopping:
+                telemetry.flush()
+                heap.collect()
+            station_departure_time = telemetry.now()
             hardware.robot.reset()
-            last_corner_finish_dist = -200
+            track.odometer_reset()
+            corner_trigger.hold_off(0, cooldown_mm)  # 🆕 no corner while finding the line either
+            station_trigger.hold_off(0, cooldown_mm)
+            if stopping:
+                speeder.reset()
+                steer.reset()
+                ticker.resync()
             
         else:
             hardware.robot.drive(current_speed, turn_rate)
         
-        wait(10)
+        heap.tick()
+        ticker.wait_next()
 
 finally:
-    actions.park_and_shutdown()
\ No newline at end of file
+    actions.park_and_shutdown(ticker, heap, locator)
\ No newline at end of file
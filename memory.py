@@ -0,0 +1,78 @@
+# memory.py
+# Garbage collection on our schedule instead of MicroPython's: automatic GC is
+# off while the mission loop runs, and the heap is collected while the robot
+# stands still (station stops, after a pickup). A cheap periodic check of the
+# free heap forces a collection only if a stop is too long in coming.
+import gc
+from pybricks.tools import StopWatch
+
+try:
+    mem_free = gc.mem_free
+except AttributeError:
+    def mem_free():
+        return -1  # CPython (sim, benches): no heap figures
+
+class HeapManager:
+    def __init__(self, min_free, check_ticks):
+        self.min_free = min_free
+        self.check_ticks = check_ticks
+        self.countdown = check_ticks
+        self.watch = StopWatch()
+        self.collections = 0
+        self.forced = 0
+        self.collect_total = 0
+        self.collect_max = 0
+        self.free_min = -1
+
+    def start(self):
+        gc.collect()
+        gc.disable()
+        self.free_min = mem_free()
+
+    def collect(self):
+        # Call while the robot is stopped
+        before = mem_free()
+        if 0 <= before < self.free_min:
+            self.free_min = before
+        self.watch.reset()
+        gc.collect()
+        ms = self.watch.time()
+        self.collections += 1
+        self.collect_total += ms
+        if ms > self.collect_max:
+            self.collect_max = ms
+        self.countdown = self.check_ticks
+
+    def tick(self):
+        # Once per loop tick: every check_ticks ticks, make sure the heap
+        # cannot run out before the next stop
+        self.countdown -= 1
+        if self.countdown > 0:
+            return
+        self.countdown = self.check_ticks
+        free = mem_free()
+        if 0 <= free < self.free_min:
+            self.free_min = free
+        if 0 <= free < self.min_free:
+            self.forced += 1
+            self.collect()
+
+    def stop(self):
+        gc.enable()
+
+    def stats(self):
+        return {
+            "collections": self.collections,
+            "forced": self.forced,
+            "collect_mean": self.collect_total / self.collections if self.collections else 0,
+            "collect_max": self.collect_max,
+            "free_min": self.free_min,
+            "free_now": mem_free(),
+        }
+
+    def report(self):
+        s = self.stats()
+        print("--- MEMORY ---")
+        print("GC: {} collections ({} forced while driving)".format(s["collections"], s["forced"]))
+        print("Collect time: mean {:.1f} ms  max {} ms".format(s["collect_mean"], s["collect_max"]))
+        print("Free heap: min {} B  now {} B".format(s["free_min"], s["free_now"]))
@@ -0,0 +1,82 @@
+# obstacle.py
+# Ultrasonic readings through a median filter, so one stray echo can neither
+# start a pick cycle nor end an approach; a burst of them can still pull the
+# median down for a read or two, so near also needs OBSTACLE_CONFIRM filtered
+# reads in a row. Detection has hysteresis (near below OBSTACLE_NEAR, cleared
+# only above OBSTACLE_CLEAR) and a closing rate lets the
+# robot brake towards APPROACH_SPEED before the object instead of stopping
+# hard. Preallocated rings, integer math: read() allocates nothing.
+import config
+import hardware
+
+FAR = 2550  # what the sensor reports when nothing is in range
+
+class ObstacleDetector:
+    def __init__(self, sensor, period_ms=config.LOOP_PERIOD):
+        self.sensor = sensor
+        self.period_ms = period_ms
+        self.raw = [FAR] * config.OBSTACLE_WINDOW
+        self.scratch = [FAR] * config.OBSTACLE_WINDOW
+        self.history = [FAR] * config.OBSTACLE_RATE_TICKS  # filtered distances
+        self.reset()
+
+    def reset(self):
+        # After a pickup or a turn: the old readings were of something else
+        for i in range(len(self.raw)):
+            self.raw[i] = FAR
+        for i in range(len(self.history)):
+            self.history[i] = FAR
+        self.pos = 0
+        self.hpos = 0
+        self.mm = FAR
+        self.rate = 0  # mm/s, > 0 while closing in
+        self.close = 0  # filtered reads in a row below OBSTACLE_NEAR
+        self.near = False
+
+    def read(self):
+        # One sensor read; returns the filtered distance (mm)
+        self.raw[self.pos] = self.sensor.distance()
+        self.pos += 1
+        if self.pos == len(self.raw):
+            self.pos = 0
+        scratch = self.scratch
+        for i in range(len(scratch)):
+            scratch[i] = self.raw[i]
+        scratch.sort()
+        self.mm = scratch[len(scratch) // 2]
+
+        # Closing rate over the last OBSTACLE_RATE_TICKS filtered values
+        oldest = self.history[self.hpos]
+        self.history[self.hpos] = self.mm
+        self.hpos += 1
+        if self.hpos == len(self.history):
+            self.hpos = 0
+        if oldest >= FAR or self.mm >= FAR:
+            self.rate = 0
+        else:
+            self.rate = (oldest - self.mm) * 1000 // (len(self.history) * self.period_ms)
+
+        if self.mm < config.OBSTACLE_NEAR:
+            self.close += 1
+            if self.close >= config.OBSTACLE_CONFIRM:
+                self.near = True
+        else:
+            self.close = 0
+            if self.mm >= config.OBSTACLE_CLEAR:
+                self.near = False
+        return self.mm
+
+    def speed_limit(self, speed):
+        # speed, or less while closing in on something inside OBSTACLE_SLOW
+        if self.rate <= 0 or self.mm >= config.OBSTACLE_SLOW:
+            return speed
+        low = config.APPROACH_SPEED
+        if speed <= low:
+            return speed
+        span = config.OBSTACLE_SLOW - config.OBSTACLE_NEAR
+        left = self.mm - config.OBSTACLE_NEAR
+        if left <= 0:
+            return low
+        return low + (speed - low) * left // span
+
+detector = ObstacleDetector(hardware.obstacle_sensor)
@@ -0,0 +1,70 @@
+# pid.py
+# Line follower on the edge error ref - THRESHOLD: proportional, integral
+# (clamped against windup) and a low-pass filtered derivative, with the gains
+# looked up from config.PID_GAINS by the current drive speed. Integer math
+# only, so a tick allocates nothing; tools/tune_pid.py fits the gain table
+# on the simulated track.
+
+SCALE = 1000  # gains are stored in 1/1000
+
+def _div(n, d):
+    # n / d (d > 0) rounded to nearest, halves away from zero: // floors, which
+    # would bias every negative result (a right turn) by up to one
+    if n >= 0:
+        return (n + d // 2) // d
+    return -((d // 2 - n) // d)
+
+class PID:
+    """Gains are per control tick (config.LOOP_PERIOD): ki multiplies the sum
+    of the errors so far, kd the change in error since the last tick."""
+
+    def __init__(self, gains, i_limit, d_filter):
+        self.gains = sorted(gains)  # [(speed mm/s, kp, ki, kd), ...]
+        self.i_limit = i_limit
+        self.d_filter = d_filter    # % of each new derivative taken (100 = unfiltered)
+        self.speed = None
+        self.kp = self.ki = self.kd = 0
+        self.reset()
+
+    def reset(self):
+        # After a stop: the old integral and error history no longer apply
+        self.integral = 0
+        self.last_error = None
+        self.derivative = 0  # filtered, x100
+
+    def schedule(self, speed):
+        # Gains for this speed, interpolated between the two nearest rows
+        if speed == self.speed:
+            return
+        self.speed = speed
+        gains = self.gains
+        if speed <= gains[0][0]:
+            _, self.kp, self.ki, self.kd = gains[0]
+            return
+        for i in range(1, len(gains)):
+            hi = gains[i]
+            if speed <= hi[0]:
+                lo = gains[i - 1]
+                span = hi[0] - lo[0]
+                part = speed - lo[0]
+                self.kp = lo[1] + _div((hi[1] - lo[1]) * part, span)
+                self.ki = lo[2] + _div((hi[2] - lo[2]) * part, span)
+                self.kd = lo[3] + _div((hi[3] - lo[3]) * part, span)
+                return
+        _, self.kp, self.ki, self.kd = gains[-1]
+
+    def update(self, error, speed):
+        # error: ref - THRESHOLD this tick. Returns the turn rate (deg/s)
+        self.schedule(speed)
+        self.integral += error
+        if self.integral > self.i_limit:
+            self.integral = self.i_limit
+        elif self.integral < -self.i_limit:
+            self.integral = -self.i_limit
+        if self.last_error is None:
+            self.last_error = error  # no derivative kick on the first tick
+        change = (error - self.last_error) * 100
+        self.derivative += _div((change - self.derivative) * self.d_filter, 100)
+        self.last_error = error
+        return _div((self.kp * error + self.ki * self.integral) * 100
+                    + self.kd * self.derivative, SCALE * 100)
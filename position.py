@@ -0,0 +1,157 @@
+# position.py
+# Which station a pad is, from where odometry says the robot is on the lap.
+# Stations 1 and 3 share a color, so the next_station counter alone is
+# desynchronised by one missed or spurious pad until it happens to meet the
+# right color again, a lap later. Here a confirmed pad is matched against the
+# mapped stations of its color (trackmap.TrackMap, snapped at every landmark)
+# and taken to be the nearest one, so the next pad puts the counter right.
+# Without a map (first lap) or far from every candidate, the counter decides
+# (with the corner checkpoint below, when given).
+# Either way the pad just left does not count again when the robot comes back
+# over it while finding the line after unloading.
+#
+# CornerCheckpoint catches a missed station without a map: it counts corners
+# between stations against the layout; one corner too many, or the pad of a
+# later station once the corners are all behind, means the station was missed.
+import config
+import trackmap
+
+class PositionEstimator:
+    """station() once per confirmed pad; confidence() whenever wanted."""
+
+    def __init__(self, track, checkpoint=None):
+        self.track = track
+        self.checkpoint = checkpoint  # CornerCheckpoint for the count, or None
+        self.missed = 0        # station the last pad showed was missed (checkpoint)
+        self.last = 0          # station the last pad was taken to be
+        self.last_pos = 0      # ... and lap_pos there
+        self.corrections = 0   # pads that were not the expected station
+        self.unexplained = 0   # pads too far from every mapped candidate
+        self.repeats = 0       # the pad just left, crossed again
+
+    def drift(self):
+        # Odometry error (mm) to allow for since the last landmark snap
+        return (self.track.lap_pos - self.track.last_landmark) * config.ODOMETRY_DRIFT // 1000
+
+    def confidence(self):
+        # 0..100: 100 on a landmark, falling as odometry is extrapolated;
+        # 0 without a map
+        track = self.track
+        if not track.ready() or track.lap_pos < 0:
+            return 0
+        return max(0, 100 - self.drift() * 100 // config.POSITION_TOLERANCE)
+
+    def station(self, ids, expected):
+        """Station id for a confirmed pad matching ids (StationTable.ids of
+        the cell), expected being the counter's next station; 0 to ignore
+        the pad. The track map is snapped to the station returned."""
+        track = self.track
+        self.missed = 0
+        if self.last in ids and track.lap_pos >= 0 and \
+                track.lap_pos - self.last_pos < config.MAP_MIN_GAP:
+            self.repeats += 1  # the pad just left, e.g. back over it after unloading
+            return 0
+        if self.checkpoint is not None:
+            expected = self.checkpoint.pad(ids, expected)
+            self.missed = self.checkpoint.missed
+        found = expected if expected in ids else 0
+        snap = True
+        if track.ready() and track.lap_pos >= 0:
+            mapped = 0
+            best = 0
+            for pos, kind, landmark_id in track.landmarks:
+                if kind == trackmap.STATION and landmark_id in ids:
+                    off = abs(track.offset(pos))
+                    if mapped == 0 or off < best:
+                        mapped, best = landmark_id, off
+            if mapped and best <= config.POSITION_TOLERANCE + self.drift():
+                if mapped != expected:
+                    self.corrections += 1
+                    print("Position: pad is station {}, not {} (confidence {})".format(
+                        mapped, expected, self.confidence()))
+                found = mapped
+            else:
+                # Nowhere near a mapped pad of that color: the counter
+                # decides, and the map is left alone
+                self.unexplained += 1
+                snap = False
+        if found:
+            if snap:
+                track.station(found)
+            self.last = found
+            self.last_pos = track.lap_pos
+        return found
+
+    def stats(self):
+        return {
+            "corrections": self.corrections,
+            "unexplained": self.unexplained,
+            "repeats": self.repeats,
+            "checkpoints": self.checkpoint.fired if self.checkpoint is not None else 0,
+            "snaps": self.track.snaps,
+            "rejected": self.track.rejected,
+        }
+
+    def report(self):
+        s = self.stats()
+        print("--- POSITION ---")
+        print("Pads: {} corrected by the map  {} off the map  {} crossed again".format(
+            s["corrections"], s["unexplained"], s["repeats"]))
+        print("Corner checkpoints fired: {}".format(s["checkpoints"]))
+        print("Track map: {} snaps  {} landmarks rejected".format(s["snaps"], s["rejected"]))
+
+class CornerCheckpoint:
+    """Corners counted since the last station, against the number the
+    layout has before the next one (config.CORNERS_BEFORE): one more means
+    that station was passed unseen. Works without a map, from the first lap."""
+
+    def __init__(self, count):
+        self.count = count
+        self.corners = 0
+        self.due = config.START_CORNERS  # corners before station 1 from the start
+        self.missed = 0      # station found missed by the last corner()
+        self.fired = 0       # times a checkpoint re-synchronised the route
+
+    def station(self, next_station):
+        # A station was reached; next_station is expected now
+        self.corners = 0
+        self.due = config.CORNERS_BEFORE[next_station - 1]
+
+    def pad(self, ids, next_station):
+        """Station a confirmed pad matching ids is by the count: next_station,
+        or, once every corner before it is behind, a later one with no corner
+        in between (next_station was missed; self.missed is the last station
+        passed unseen). next_station when neither fits."""
+        self.missed = 0
+        if next_station in ids or self.corners < self.due:
+            return next_station
+        station = next_station
+        for _ in range(self.count - 1):
+            following = station % self.count + 1
+            if config.CORNERS_BEFORE[following - 1] > 0:
+                break
+            self.missed = station
+            station = following
+            if station in ids:
+                self.fired += 1
+                return station
+        self.missed = 0
+        return next_station
+
+    def corner(self, next_station):
+        """Counts a corner; returns the station expected after it, which is
+        not next_station when next_station was missed (self.missed is then
+        the last station passed unseen, self.corners 1 if this is the first
+        corner after it)."""
+        self.corners += 1
+        self.missed = 0
+        for _ in range(self.count):
+            if self.corners <= self.due:
+                break
+            self.corners -= self.due
+            self.missed = next_station
+            next_station = next_station % self.count + 1
+            self.due = config.CORNERS_BEFORE[next_station - 1]
+        if self.missed:
+            self.fired += 1
+        return next_station
@@ -0,0 +1,83 @@
+# scheduler.py
+# Fixed-rate tick scheduler for the mission loop. Each tick is released against
+# a monotonic deadline instead of sleeping a fixed 10 ms after the work, so the
+# loop period stays at config.LOOP_PERIOD no matter how long the body takes.
+from pybricks.tools import wait, StopWatch
+
+HIST_SIZE = 64  # tick period histogram buckets (1 ms each, last one = overflow)
+
+class TickScheduler:
+    def __init__(self, period_ms):
+        self.period = period_ms
+        self.watch = StopWatch()
+        self.deadline = 0
+        self.last_start = 0
+        self.ticks = 0
+        self.overruns = 0
+        self.jitter_sum = 0
+        self.jitter_max = 0
+        self.hist = [0] * HIST_SIZE
+
+    def start(self):
+        self.watch.reset()
+        self.deadline = self.period
+        self.last_start = 0
+
+    def resync(self):
+        # Call after a deliberate long action (pickup, station stop) so it is
+        # not counted as an overrun and the next tick starts a fresh period
+        now = self.watch.time()
+        self.deadline = now + self.period
+        self.last_start = now
+
+    def wait_next(self):
+        now = self.watch.time()
+        late = now > self.deadline
+        if not late:
+            wait(self.deadline - now)
+            now = self.watch.time()
+
+        # Against the deadline this tick was due at, missed or not
+        jitter = now - self.deadline
+        self.jitter_sum += jitter
+        if jitter > self.jitter_max:
+            self.jitter_max = jitter
+        if late:
+            # Body ran past its deadline: skip the lost slots instead of bursting
+            self.overruns += 1
+            self.deadline = now
+
+        period = now - self.last_start
+        self.hist[period if period < HIST_SIZE else HIST_SIZE - 1] += 1
+        self.last_start = now
+        self.deadline += self.period
+        self.ticks += 1
+
+    def percentile(self, pct):
+        # Tick period (ms) below which pct % of the ticks fall
+        if self.ticks == 0:
+            return 0
+        limit = self.ticks * pct / 100
+        seen = 0
+        for ms in range(HIST_SIZE):
+            seen += self.hist[ms]
+            if seen >= limit:
+                return ms
+        return HIST_SIZE - 1
+
+    def stats(self):
+        return {
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "jitter_mean": self.jitter_sum / self.ticks if self.ticks else 0,
+            "jitter_max": self.jitter_max,
+            "period_p50": self.percentile(50),
+            "period_p99": self.percentile(99),
+        }
+
+    def report(self):
+        s = self.stats()
+        print("--- LOOP TIMING ({} ms target) ---".format(self.period))
+        print("Ticks: {}  Overruns: {}".format(s["ticks"], s["overruns"]))
+        print("Jitter: mean {:.2f} ms  max {} ms".format(s["jitter_mean"], s["jitter_max"]))
+        print("Period: p50 {} ms  p99 {} ms".format(s["period_p50"], s["period_p99"]))
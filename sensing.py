@@ -0,0 +1,95 @@
+# sensing.py
+# The line sensor sample for one tick: color class, reflection and the
+# station/classifier table cell. By default color() and reflection() are read
+# (two mode switches per tick), the modes every threshold in config.py was
+# measured in. With config.LINE_RGB the sensor stays in RGB mode and both are
+# derived from one rgb() read, so the EV3 never switches modes inside the
+# control loop; that needs RGB_* fitted from real dumps (tools/calibrate.py
+# --fit-rgb) first.
+from pybricks.parameters import Color
+import config
+
+# Index = color code (same numbering as the EV3 color mode, see info.txt)
+COLORS = (None, Color.BLACK, Color.BLUE, Color.GREEN, Color.YELLOW,
+          Color.RED, Color.WHITE, Color.BROWN)
+
+NONE, BLACK, BLUE, GREEN, YELLOW, RED, WHITE, BROWN = range(8)
+
+REFL_STEPS = 101  # reflection 0..100; cell = code * REFL_STEPS + reflection
+
+CODE_OF = {}  # Color -> code, for the per-tick lookup in mode reads
+for _code in range(len(COLORS)):
+    CODE_OF[COLORS[_code]] = _code
+
+def color_code(color):
+    # Color -> code, used when compiling config lists (never per tick)
+    for code in range(len(COLORS)):
+        if COLORS[code] == color:
+            return code
+    return NONE
+
+def classify(r, g, b):
+    # Integer-only HSV style classification of an RGB (0-100 %) reading
+    hi = max(r, g, b)
+    lo = min(r, g, b)
+    if hi <= config.RGB_NONE_MAX:
+        return NONE
+    if hi < config.RGB_BLACK_MAX:
+        return BLACK
+    chroma = hi - lo
+    if chroma * 100 < hi * config.RGB_MIN_SATURATION:
+        return WHITE if hi >= config.RGB_WHITE_MIN else BLACK
+
+    if hi == r:
+        hue = (60 * (g - b)) // chroma
+        if hue < 0: hue += 360
+    elif hi == g:
+        hue = 120 + (60 * (b - r)) // chroma
+    else:
+        hue = 240 + (60 * (r - g)) // chroma
+
+    for upper, code in config.RGB_HUE_BANDS:
+        if hue < upper:
+            if (code == RED or code == YELLOW) and hi < config.RGB_BROWN_MAX:
+                return BROWN
+            return code
+    return RED
+
+def reflection(r, g, b):
+    # Weighted channel sum (weights in %), clamped to the 0-100 reflection scale
+    wr, wg, wb = config.RGB_REFL_WEIGHTS
+    ref = (wr * r + wg * g + wb * b) // 100
+    if ref < 0: return 0
+    if ref > 100: return 100
+    return ref
+
+class ColorSampler:
+    """Reads a ColorSensor once per tick (config.LINE_RGB: in RGB mode) and
+    keeps the derived values; r, g, b stay 0 in mode reads."""
+
+    def __init__(self, sensor):
+        self.sensor = sensor
+        self.rgb_mode = config.LINE_RGB
+        self.r = 0
+        self.g = 0
+        self.b = 0
+        self.code = NONE
+        self.color = None
+        self.reflection = 0
+        self.cell = 0
+
+    def read(self):
+        if self.rgb_mode:
+            r, g, b = self.sensor.rgb()
+            self.r = r
+            self.g = g
+            self.b = b
+            self.code = classify(r, g, b)
+            self.color = COLORS[self.code]
+            self.reflection = reflection(r, g, b)
+        else:
+            self.color = self.sensor.color()
+            self.code = CODE_OF.get(self.color, NONE)
+            self.reflection = self.sensor.reflection()
+        self.cell = self.code * REFL_STEPS + self.reflection
+        return self
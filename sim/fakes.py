@@ -0,0 +1,82 @@
+# fakes.py
+# Stand-in devices with configurable latencies, for timing experiments on a PC.
+import time
+from pybricks.parameters import Color
+
+class FakeColorSensor:
+    """ColorSensor whose reads cost real time, like the EV3 UART sensor.
+
+    Every read costs read_ms; a read in a different mode than the previous
+    one additionally costs switch_ms (the EV3 has to reconfigure the sensor).
+    surface() returns the (color, reflection, ambient, (r, g, b)) under it.
+    """
+
+    def __init__(self, switch_ms=25, read_ms=1, surface=None):
+        self.switch_ms = switch_ms
+        self.read_ms = read_ms
+        self.surface = surface or (lambda: (Color.WHITE, 85, 4, (85, 80, 78)))
+        self.mode = None
+        self.reads = 0
+        self.switches = 0
+
+    def _read(self, mode):
+        cost = self.read_ms
+        if mode != self.mode:
+            if self.mode is not None:
+                self.switches += 1
+            self.mode = mode
+            cost += self.switch_ms
+        self.reads += 1
+        if cost:
+            time.sleep(cost / 1000)
+        return self.surface()
+
+    def color(self):
+        return self._read("COL-COLOR")[0]
+
+    def reflection(self):
+        return self._read("COL-REFLECT")[1]
+
+    def ambient(self):
+        return self._read("COL-AMBIENT")[2]
+
+    def rgb(self):
+        return self._read("RGB-RAW")[3]
+
+class FakeSpeaker:
+    """Speaker whose say() blocks like espeak on the brick.
+
+    A phrase costs synth_ms plus per_char_ms (playback) for every character;
+    render() writes a stand-in .wav for speech.PhraseCache at the same synth
+    cost, and play_file() costs only the playback part.
+    """
+
+    def __init__(self, synth_ms=600, per_char_ms=40):
+        self.synth_ms = synth_ms
+        self.per_char_ms = per_char_ms
+        self.phrases = []
+
+    def say(self, text):
+        time.sleep((self.synth_ms + self.per_char_ms * len(text)) / 1000)
+        self.phrases.append(text)
+
+    def render(self, text, path):
+        time.sleep(self.synth_ms / 1000)
+        with open(path, "w") as f:
+            f.write(text)
+        return True
+
+    def play_file(self, path):
+        with open(path) as f:
+            text = f.read()
+        time.sleep(self.per_char_ms * len(text) / 1000)
+        self.phrases.append(text)
+
+    def set_speech_options(self, language=None, voice=None, speed=None, pitch=None):
+        pass
+
+    def beep(self, frequency=500, duration=100):
+        time.sleep(duration / 1000)
+
+    def set_volume(self, volume, which="_all_"):
+        pass
@@ -0,0 +1,2 @@
+# Off-robot stand-in for the pybricks package.
+# Only put sim/ on sys.path when running on a PC - never copy it to the brick.
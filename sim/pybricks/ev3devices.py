@@ -0,0 +1,12 @@
+# pybricks/ev3devices.py (off-robot stand-in): devices live in the active world
+from pybricks.parameters import Direction
+import world
+
+def Motor(port, positive_direction=Direction.CLOCKWISE, gears=None):
+    return world.active().motor(port)
+
+def ColorSensor(port):
+    return world.active().color_sensor(port)
+
+def UltrasonicSensor(port):
+    return world.active().ultrasonic_sensor(port)
@@ -0,0 +1,25 @@
+# pybricks/parameters.py (off-robot stand-in)
+
+class _Constant:
+    def __init__(self, group, name):
+        self.group = group
+        self.name = name
+
+    def __repr__(self):
+        return self.group + "." + self.name
+
+    __str__ = __repr__
+
+def _enum(group, names):
+    cls = type(group, (), {})
+    for name in names:
+        setattr(cls, name, _Constant(group, name))
+    return cls
+
+Port = _enum("Port", ["A", "B", "C", "D", "S1", "S2", "S3", "S4"])
+Direction = _enum("Direction", ["CLOCKWISE", "COUNTERCLOCKWISE"])
+Stop = _enum("Stop", ["COAST", "BRAKE", "HOLD"])
+Color = _enum("Color", ["BLACK", "BLUE", "GREEN", "YELLOW", "RED", "WHITE",
+                        "BROWN", "ORANGE", "PURPLE"])
+Button = _enum("Button", ["LEFT_DOWN", "DOWN", "RIGHT_DOWN", "LEFT", "CENTER",
+                          "RIGHT", "LEFT_UP", "UP", "BEACON", "RIGHT_UP"])
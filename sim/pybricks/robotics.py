@@ -0,0 +1,5 @@
+# pybricks/robotics.py (off-robot stand-in)
+import world
+
+def DriveBase(left_motor, right_motor, wheel_diameter, axle_track):
+    return world.active().make_drivebase(left_motor, right_motor, wheel_diameter, axle_track)
@@ -0,0 +1,30 @@
+# pybricks/tools.py (off-robot stand-in)
+# Time comes from the active sim backend: the virtual clock of an installed
+# world.World, or wall-clock time when none is installed.
+import world
+
+def wait(time_ms):
+    world.active().wait(time_ms)
+
+class StopWatch:
+    def __init__(self):
+        self._start = world.active().now()
+        self._paused_at = None
+
+    def time(self):
+        now = self._paused_at if self._paused_at is not None else world.active().now()
+        return int(now - self._start)
+
+    def pause(self):
+        if self._paused_at is None:
+            self._paused_at = world.active().now()
+
+    def resume(self):
+        if self._paused_at is not None:
+            self._start += world.active().now() - self._paused_at
+            self._paused_at = None
+
+    def reset(self):
+        self._start = world.active().now()
+        if self._paused_at is not None:
+            self._paused_at = self._start
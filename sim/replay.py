@@ -0,0 +1,220 @@
+# replay.py
+# Feeds traces recorded with config.TRACE (tracing.py) back through the
+# unmodified main.py, as fast as the CPU allows, and checks that it makes the
+# same decisions (corners, arrivals, pickups, drops).
+#
+#   python3 sim/replay.py trace.txt
+#   python3 sim/replay.py traces/*.txt --set WHITE_THRESHOLD=80
+#
+# Every read pops the next recorded result for that device and method, and
+# moves the clock to the time it was recorded at. Motor commands are compared
+# against the recording but never required.
+import argparse
+import collections
+import os
+import runpy
+import sys
+import threading
+import time
+
+import run  # also puts the robot code and sim/ on sys.path
+import world
+from pybricks.parameters import Button, Color, Direction, Port, Stop
+
+# Methods whose recorded result the program depends on: running out of these
+# ends the replay
+READS = ("rgb", "color", "reflection", "ambient", "distance", "angle", "speed",
+         "pressed", "done", "stalled", "state", "voltage", "current", "limits",
+         "run_until_stalled")
+
+_NAMES = {"Button": Button, "Color": Color, "Direction": Direction, "Port": Port,
+          "Stop": Stop, "__builtins__": {}}
+
+class EndOfTrace(Exception):
+    pass
+
+def _args(*args, **kwargs):
+    return args, kwargs
+
+_ARGS_NAMES = dict(_NAMES, _args=_args)
+
+class Trace:
+    """A recorded trace: per (device, method) call queues plus the decisions."""
+
+    def __init__(self, path):
+        self.path = path
+        self.calls = collections.defaultdict(collections.deque)
+        self.decisions = []
+        values = {}
+        with open(path) as f:
+            for line in f:
+                if line.startswith("#"):
+                    continue
+                t, name, method, args, result = line.rstrip("\n").split("\t")
+                if result not in values:
+                    values[result] = eval(result, _NAMES)
+                if name == "decision":
+                    self.decisions.append((int(t), method, values[result]))
+                else:
+                    self.calls[name, method].append((int(t), args, values[result]))
+
+class ReplayDevice:
+    def __init__(self, name, replayer):
+        self._name = name
+        self._replayer = replayer
+
+    def __getattr__(self, attr):
+        if attr in ("control", "buttons", "speaker", "light", "screen", "battery"):
+            value = ReplayDevice(self._name + "." + attr, self._replayer)
+        else:
+            value = self._replayer.method(self._name, attr)
+        setattr(self, attr, value)
+        return value
+
+class Replayer:
+    """Clock and device backend for one replay; also takes tracing.py's
+    decisions in place of the Recorder."""
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.now_ms = 0
+        self.main_thread = threading.get_ident()
+        self.decisions = []
+        self.mismatches = collections.Counter()  # commands issued differently
+        self.parsed = {}
+        self.ended = None
+
+    # --- clock (pybricks.tools) ---
+    def now(self):
+        return self.now_ms
+
+    def wait(self, ms):
+        if threading.get_ident() == self.main_thread:
+            self.now_ms += max(0, ms)
+        else:
+            time.sleep(0)
+
+    # --- devices: hardware.py builds these, tracing.attach() swaps them out ---
+    def brick(self):
+        return None
+
+    def motor(self, port):
+        return None
+
+    def color_sensor(self, port):
+        return None
+
+    def ultrasonic_sensor(self, port):
+        return None
+
+    def make_drivebase(self, left, right, wheel_diameter, axle_track):
+        return None
+
+    def wrap(self, device, name):
+        return ReplayDevice(name, self)
+
+    def method(self, name, attr):
+        queue = self.trace.calls[name, attr]
+        def call(*args, **kwargs):
+            if not queue:
+                if attr in READS:
+                    raise EndOfTrace("{}.{}() at {} ms".format(name, attr, self.now_ms))
+                return None
+            t, recorded_args, result = queue.popleft()
+            if threading.get_ident() == self.main_thread and t > self.now_ms:
+                self.now_ms = t
+            if attr not in READS and self.parse_args(recorded_args) != (args, kwargs):
+                self.mismatches[name + "." + attr] += 1
+            return result
+        return call
+
+    def parse_args(self, text):
+        if text not in self.parsed:
+            self.parsed[text] = eval("_args(" + text + ")", _ARGS_NAMES)
+        return self.parsed[text]
+
+    # --- tracing.py recorder interface ---
+    def decision(self, kind, value):
+        self.decisions.append((self.now_ms, kind, value))
+
+    def close(self):
+        pass
+
+def replay(path, overrides=None, script="main.py", quiet=True):
+    """Runs script against the trace at path; returns the Replayer."""
+    trace = Trace(path)
+    replayer = Replayer(trace)
+    run._forget_robot_modules()
+    world.install(replayer)
+    import config
+    for key, value in run.SIM_CONFIG.items():
+        setattr(config, key, value)
+    for key, value in (overrides or {}).items():
+        if not hasattr(config, key):
+            raise KeyError("config has no setting " + key)
+        setattr(config, key, value)
+    config.TRACE = True
+    import tracing
+    tracing.recorder = replayer
+
+    out = open(os.devnull, "w") if quiet else sys.stdout
+    wall = time.perf_counter()
+    stdout = sys.stdout
+    sys.stdout = out
+    try:
+        runpy.run_path(os.path.join(run.ROOT, script), run_name="__main__")
+    except EndOfTrace as e:
+        replayer.ended = str(e)
+    finally:
+        sys.stdout = stdout
+        if quiet:
+            out.close()
+        replayer.wall_s = time.perf_counter() - wall
+        world.install(world.RealTimeBackend())
+    return replayer
+
+def first_difference(recorded, replayed):
+    # Index of the first decision that differs in kind or value, or -1
+    for i in range(max(len(recorded), len(replayed))):
+        if i >= len(recorded) or i >= len(replayed):
+            return i
+        if recorded[i][1:] != replayed[i][1:]:
+            return i
+    return -1
+
+def _describe(decisions, i):
+    if i >= len(decisions):
+        return "(nothing)"
+    t, kind, value = decisions[i]
+    return "{} {} at {} ms".format(kind, value, t)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded traces through main.py")
+    parser.add_argument("traces", nargs="+")
+    parser.add_argument("--script", default="main.py")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a config.py setting")
+    parser.add_argument("--verbose", action="store_true", help="show the program's output")
+    args = parser.parse_args()
+
+    overrides = run.parse_overrides(args.set)
+    failed = 0
+    for path in args.traces:
+        r = replay(path, overrides, args.script, quiet=not args.verbose)
+        recorded = r.trace.decisions
+        i = first_difference(recorded, r.decisions)
+        if i < 0:
+            print("same  {}  {} decisions  {:.2f} s".format(path, len(recorded), r.wall_s))
+        else:
+            failed += 1
+            print("DIFF  {}  decision {}: recorded {}, replayed {}".format(
+                path, i + 1, _describe(recorded, i), _describe(r.decisions, i)))
+        if r.ended:
+            print("      trace ran out: " + r.ended)
+        if r.mismatches:
+            print("      commands issued differently: " + ", ".join(
+                "{} x{}".format(k, n) for k, n in r.mismatches.most_common()))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
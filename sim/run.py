@@ -0,0 +1,134 @@
+# run.py
+# Runs an unmodified robot program (main.py by default) against the simulated
+# world at whatever speed the CPU allows.
+#
+#   python3 sim/run.py --laps 3
+#   python3 sim/run.py --minutes 10 --set DRIVE_SPEED=80 --verbose
+import argparse
+import ast
+import contextlib
+import io
+import os
+import runpy
+import sys
+import time
+
+SIM = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(SIM)
+for _p in (ROOT, SIM):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+import world  # noqa: E402
+
+# Objects placed on the default track: (material, track position in mm)
+DEFAULT_OBJECTS = [("Plastic", 300), ("Paper", 1000), ("Others", 1900)]
+
+# Robot settings that make no sense off the brick
+SIM_CONFIG = {
+    "SPEECH_CACHE": False,  # no espeak here; SimSpeaker models the say() latency
+    "CHOREO_REPORT": False,
+    "TELEMETRY": False,  # keep telemetry.bin out of the project folder
+    "TRACK_MAP_FILE": None,  # learn the map every run
+    "HOMING_FILE": None,  # full homing every run
+}
+
+def parse_value(text):
+    # Python literals (numbers, True/False/None, lists of tuples); else a string
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+def parse_overrides(items):
+    overrides = {}
+    for item in items:
+        key, value = item.split("=", 1)
+        overrides[key.strip()] = parse_value(value.strip())
+    return overrides
+
+def _forget_robot_modules():
+    # A fresh import of config/hardware/actions/... for every run
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None) or ""
+        if path.startswith(ROOT + os.sep) and not path.startswith(SIM + os.sep):
+            if os.path.dirname(path) == ROOT:
+                del sys.modules[name]
+
+def run_mission(script="main.py", overrides=None, stop_ms=None, laps=None, sorts=None,
+                objects=DEFAULT_OBJECTS, quiet=True, setup=None, **world_args):
+    """Runs script in a new World until a stop condition presses CENTER.
+
+    overrides are applied to config before the script starts; setup(world)
+    is called after config is loaded, for instrumentation. Returns the World.
+    """
+    _forget_robot_modules()
+    w = world.World(objects=objects, **world_args)
+    w.stop_ms = stop_ms
+    w.stop_laps = laps
+    w.stop_sorts = sorts
+    world.install(w)
+
+    import config
+    for key, value in SIM_CONFIG.items():
+        setattr(config, key, value)
+    for key, value in (overrides or {}).items():
+        if not hasattr(config, key):
+            raise KeyError("config has no setting " + key)
+        setattr(config, key, value)
+    if overrides and "STATIONS" not in overrides and any(k.startswith("STATION_") for k in overrides):
+        # config builds STATIONS from the STATION_n_* values when imported
+        config.STATIONS = [
+            tuple(getattr(config, "STATION_{}_{}".format(n, part)) for part in ("COLOR", "MIN", "MAX"))
+            for n in range(1, len(config.STATIONS) + 1)]
+    if setup is not None:
+        setup(w)
+
+    out = io.StringIO() if quiet else sys.stdout
+    wall = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(out):
+            runpy.run_path(os.path.join(ROOT, script), run_name="__main__")
+    finally:
+        w.wall_s = time.perf_counter() - wall
+        world.install(world.RealTimeBackend())
+    return w
+
+def summary(w):
+    sim_s = w.now() / 1000
+    correct = sum(1 for entry in w.sorted if entry[3])
+    lines = [
+        "sim time   {:8.1f} s   wall {:6.2f} s   ({:.0f}x real time)".format(
+            sim_s, w.wall_s, sim_s / w.wall_s if w.wall_s else 0),
+        "laps       {:8d}".format(w.laps()),
+        "sorts      {:8d}   correct {}   per hour {:.1f}".format(
+            len(w.sorted), correct, len(w.sorted) * 3600 / sim_s if sim_s else 0),
+    ]
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a robot program in the simulator")
+    parser.add_argument("script", nargs="?", default="main.py")
+    parser.add_argument("--minutes", type=float, default=None, help="stop after this much sim time")
+    parser.add_argument("--laps", type=int, default=None)
+    parser.add_argument("--sorts", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-objects", action="store_true")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a config.py setting")
+    parser.add_argument("--verbose", action="store_true", help="show the program's output")
+    args = parser.parse_args()
+
+    if args.minutes:
+        stop_ms = args.minutes * 60000
+    elif args.laps is None and args.sorts is None:
+        stop_ms = 5 * 60000
+    else:
+        stop_ms = 60 * 60000  # a robot that got lost never finishes its laps
+    w = run_mission(args.script, parse_overrides(args.set), stop_ms, args.laps, args.sorts,
+                    objects=[] if args.no_objects else DEFAULT_OBJECTS,
+                    quiet=not args.verbose, seed=args.seed)
+    print(summary(w))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,802 @@
+# world.py
+# Simulated EV3 behind the sim/pybricks stand-ins: a virtual clock, a
+# differential-drive robot on a 2D track map (line, white corner patches,
+# colored station pads, objects and bins) and the motors and sensors that
+# hardware.py creates. Time only moves when the program waits or blocks, so a
+# mission runs as fast as the CPU allows.
+import math
+import random
+import threading
+import time
+
+from pybricks.parameters import Button, Color, Port, Stop
+
+# --- SURFACES: (color, reflection %, rgb %) ---
+FLOOR = (Color.WHITE, 70, (70, 68, 66))
+LINE = (Color.BLACK, 8, (8, 8, 7))
+CORNER_PATCH = (Color.WHITE, 95, (95, 93, 90))
+PADS = {
+    "red": (Color.RED, 64, (64, 18, 12)),
+    "blue": (Color.BLUE, 34, (34, 45, 80)),
+    "orange": (Color.RED, 70, (70, 30, 10)),
+    "green": (Color.GREEN, 30, (22, 48, 20)),
+    "yellow": (Color.YELLOW, 62, (62, 60, 12)),
+}
+NOTHING = (None, 1, (1, 1, 1))
+CORNER_MARK = 60  # length of a corner patch along the track (mm)
+
+# Material -> what the clamp sensor sees (values from info.txt)
+MATERIALS = {
+    "Plastic": (Color.BLACK, 9, (9, 9, 8)),
+    "Paper": (Color.WHITE, 47, (47, 46, 44)),
+    "Others": (Color.GREEN, 30, (20, 40, 18)),
+}
+
+# --- ROBOT GEOMETRY (mm) ---
+LINE_SENSOR_AHEAD = 60
+ULTRASONIC_AHEAD = 80
+SENSOR_SPOT = 6          # radius of the color sensor's light spot
+GRAB_NEAR = 70           # object centre must be this far ahead of the axle ...
+GRAB_FAR = 135           # ... and no further, to end up between the jaws
+GRAB_SIDE = 35
+ARM_DOWN_ZONE = -40      # arm angle (boot pose = 0) above which the jaws reach the floor
+BIN_DISTANCE = 340       # bin centre from where the robot stops at its station
+BIN_RADIUS = 90
+BIN_REACH = 120          # a released object within this of a bin centre lands in it
+
+class Track:
+    """Closed line built from ("straight", length) and ("arc", radius, degrees)
+    segments (degrees > 0 turn left), sampled every `spacing` mm."""
+
+    def __init__(self, segments, line_width=20, spacing=2.0):
+        self.line_width = line_width
+        self.xs, self.ys, self.hs, self.ss = [], [], [], []
+        x = y = h = s = 0.0
+        for seg in segments:
+            if seg[0] == "straight":
+                n = max(1, int(round(seg[1] / spacing)))
+                step = seg[1] / n
+                for _ in range(n):
+                    self._add(x, y, h, s)
+                    x += step * math.cos(h)
+                    y += step * math.sin(h)
+                    s += step
+            else:
+                radius, degrees = seg[1], seg[2]
+                length = abs(radius * math.radians(degrees))
+                n = max(1, int(round(length / spacing)))
+                dh = math.radians(degrees) / n
+                step = length / n
+                for _ in range(n):
+                    self._add(x, y, h, s)
+                    x += step * math.cos(h + dh / 2)
+                    y += step * math.sin(h + dh / 2)
+                    h += dh
+                    s += step
+        self.length = s
+        self.n = len(self.ss)
+        self.patches = []
+
+    def _add(self, x, y, h, s):
+        self.xs.append(x)
+        self.ys.append(y)
+        self.hs.append(h)
+        self.ss.append(s)
+
+    def index(self, s):
+        return int((s % self.length) / self.length * self.n) % self.n
+
+    def point(self, s):
+        i = self.index(s)
+        return self.xs[i], self.ys[i], self.hs[i]
+
+    def nearest(self, x, y, hint):
+        # Hill-climbs from hint; the robot never moves far between calls
+        n = self.n
+
+        def d2(i):
+            return (self.xs[i] - x) ** 2 + (self.ys[i] - y) ** 2
+
+        i = hint % n
+        best = d2(i)
+        for direction in (1, -1):
+            while True:
+                j = (i + direction) % n
+                dj = d2(j)
+                if dj >= best:
+                    break
+                i, best = j, dj
+        h = self.hs[i]
+        lateral = -math.sin(h) * (x - self.xs[i]) + math.cos(h) * (y - self.ys[i])
+        return i, lateral
+
+    def add_patch(self, start, length, surface, kind, station=0, left=60, right=-60):
+        # Covers track positions [start, start + length) and lateral offsets
+        # right..left (mm, + = left of the direction of travel)
+        self.patches.append((start, start + length, right, left, surface, kind, station))
+
+    def surface(self, i, lateral):
+        s = self.ss[i]
+        for patch in self.patches:
+            start, end, right, left, surface, kind, station = patch
+            if start <= s < end and right <= lateral <= left:
+                return surface, kind, patch
+        return self.bare(lateral)
+
+    def bare(self, lateral):
+        # Line/floor blend by the share of the light spot that is on the line
+        edge = self.line_width / 2 - abs(lateral)
+        f = min(1.0, max(0.0, (edge + SENSOR_SPOT) / (2 * SENSOR_SPOT)))
+        if f == 0.0:
+            return FLOOR, "floor", None
+        mix = tuple(a * (1 - f) + b * f for a, b in zip(FLOOR[2], LINE[2]))
+        color = LINE[0] if f > 0.5 else FLOOR[0]
+        return (color, FLOOR[1] * (1 - f) + LINE[1] * f, mix), "line", None
+
+def default_track():
+    """Counter-clockwise loop after the layout in info.txt: three corners,
+    then stations 1-3 on one side, one more corner, back to the start."""
+    r = 30  # near-square corners: the follower turns on the patch, not the line
+    straight_a = 770 - 2 * r
+    straight_b = 1040 - 2 * r
+    track = Track([
+        ("straight", 600 - r), ("arc", r, 90),         # corner 1
+        ("straight", straight_b), ("arc", r, 90),      # corner 2
+        ("straight", straight_a), ("arc", r, 90),      # corner 3
+        ("straight", straight_b), ("arc", r, 90),      # corner 4
+        ("straight", 170 - r),
+    ])
+    arc = r * math.pi / 2
+    corner_mid = []
+    s = 600 - r
+    for straight in (straight_b, straight_a, straight_b, None):
+        corner_mid.append(s + arc / 2)
+        if straight is not None:
+            s += arc + straight
+    # White patches laid across the line from each corner on, as on the mat:
+    # the line sensor crosses the whole patch, and the follower, seeing only
+    # white, turns in until it picks the line up again past the patch
+    for mid in corner_mid:
+        track.add_patch(mid, CORNER_MARK, CORNER_PATCH, "corner")
+    # Stations along the side after corner 3 (5 cm / 29 cm / 37 cm gaps)
+    side = corner_mid[2] + CORNER_MARK
+    track.add_patch(side + 50, 30, PADS["red"], "station", 1)
+    track.add_patch(side + 50 + 30 + 290, 30, PADS["blue"], "station", 2)
+    track.add_patch(side + 50 + 30 + 290 + 30 + 370, 30, PADS["orange"], "station", 3)
+    return track
+
+class RealTimeBackend:
+    # Active when no World is installed (bench scripts): plain wall-clock time
+    def now(self):
+        return time.monotonic() * 1000
+
+    def wait(self, ms):
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+    def __getattr__(self, name):
+        raise RuntimeError("no simulated world installed - run through sim/run.py")
+
+_active = RealTimeBackend()
+
+def active():
+    return _active
+
+def install(w):
+    global _active
+    _active = w
+
+class SimObject:
+    def __init__(self, material, x, y, spawn=None):
+        self.material = material
+        self.x = x
+        self.y = y
+        self.spawn = spawn
+        self.radius = 25
+        self.jaw_angle = 30   # clamp angle at which the jaws close on it
+        self.picked_at = -1
+
+class World:
+    def __init__(self, track=None, seed=0, dt=5, objects=(), read_ms=1, switch_ms=10,
+                 speech_ms=600, speech_char_ms=40, noise=1.5, ghost_echo=0.0, worn_pads=0.0):
+        self.track = track or default_track()
+        self.rng = random.Random(seed)
+        self.dt = dt
+        self.read_ms = read_ms
+        self.switch_ms = switch_ms
+        self.speech_ms = speech_ms
+        self.speech_char_ms = speech_char_ms
+        self.noise = noise
+        self.ghost_echo = ghost_echo  # share of ultrasonic reads that are a stray short echo
+        self.worn_pads = worn_pads    # share of station pad crossings that read as bare line
+        self.now_ms = 0.0
+        self.main_thread = threading.get_ident()
+        self.cond = threading.Condition()
+
+        # Robot pose: axle centre with the line sensor on the right line edge
+        x, y, h = self.track.point(0)
+        off = -self.track.line_width / 2
+        self.x = x - off * math.sin(h)
+        self.y = y + off * math.cos(h)
+        self.h = h
+        self.hint = 0
+        self.sensor_hint = 0
+        self.progress = 0.0      # track distance covered by the axle (for laps)
+        self.last_patch = None
+        self.sensor_patch = None # patch under the line sensor, worn or not
+        self.worn = None         # station patch that reads as bare line this crossing
+
+        self.motors = {}
+        self.sensors = {}
+        self.drivebase = None
+        self.brick_obj = None
+
+        self.objects = []
+        for material, s in objects:
+            self.spawn(material, s)
+        self.held = None
+        self.candidate = None
+        self.bins = {}
+        for start, end, _, _, _, kind, station in self.track.patches:
+            if kind == "station":
+                self._place_bin(station, (start + end) / 2)
+
+        self.events = []
+        self.sorted = []
+        self.start_press = None
+        self.stop_ms = None
+        self.stop_laps = None
+        self.stop_sorts = None
+
+    # --- CLOCK ---
+    def now(self):
+        return self.now_ms
+
+    def wait(self, ms):
+        if threading.get_ident() != self.main_thread:
+            self.sleep_until(self.now_ms + ms)
+            return
+        end = self.now_ms + ms
+        while self.now_ms < end:
+            self.step(min(self.dt, end - self.now_ms))
+        with self.cond:
+            self.cond.notify_all()
+
+    def sleep_until(self, t):
+        # For background threads: block until the main thread has moved the clock
+        with self.cond:
+            while self.now_ms < t:
+                self.cond.wait(0.05)
+
+    # --- SCENE ---
+    def spawn(self, material, s, lateral=None):
+        if lateral is None:
+            lateral = -self.track.line_width / 2
+        x, y, h = self.track.point(s)
+        obj = SimObject(material, x - lateral * math.sin(h), y + lateral * math.cos(h), s)
+        self.objects.append(obj)
+        return obj
+
+    def _place_bin(self, station, s):
+        # Where unload_sequence() ends up: 150 deg clockwise from the track
+        # heading, measured from the axle while the line sensor is on the pad
+        x, y, h = self.track.point(s - LINE_SENSOR_AHEAD)
+        a = h - math.radians(150)
+        self.bins[station] = (x + BIN_DISTANCE * math.cos(a),
+                              y + BIN_DISTANCE * math.sin(a), BIN_RADIUS)
+
+    def log(self, kind, **data):
+        self.events.append((self.now_ms, kind, data))
+
+    def laps(self):
+        return int(self.progress // self.track.length)
+
+    def finished(self):
+        if self.stop_ms is not None and self.now_ms >= self.stop_ms:
+            return True
+        if self.stop_laps is not None and self.laps() >= self.stop_laps:
+            return True
+        if self.stop_sorts is not None and len(self.sorted) >= self.stop_sorts:
+            return True
+        return False
+
+    # --- DEVICES (created by the sim/pybricks factories) ---
+    def motor(self, port):
+        if port not in self.motors:
+            if port == Port.A:      # clamp: closed stop at 0, fully open at 100
+                self.motors[port] = SimMotor(self, port, 0, 100, 1400)
+            elif port == Port.B:    # arm: boot pose (down) = 0, up is negative
+                self.motors[port] = SimMotor(self, port, -320, 10, 1000)
+            else:
+                self.motors[port] = SimMotor(self, port, None, None, 1000)
+        return self.motors[port]
+
+    def color_sensor(self, port):
+        self.sensors[port] = SimColorSensor(self, port)
+        return self.sensors[port]
+
+    def ultrasonic_sensor(self, port):
+        self.sensors[port] = SimUltrasonicSensor(self, port)
+        return self.sensors[port]
+
+    def make_drivebase(self, left, right, wheel_diameter, axle_track):
+        self.drivebase = SimDriveBase(self, left, right, wheel_diameter, axle_track)
+        return self.drivebase
+
+    def brick(self):
+        if self.brick_obj is None:
+            self.brick_obj = SimBrick(self)
+        return self.brick_obj
+
+    # --- PHYSICS ---
+    def step(self, dt):
+        t = dt / 1000
+        for m in self.motors.values():
+            if self.drivebase is None or (m is not self.drivebase.left and m is not self.drivebase.right):
+                m.step(t)
+        if self.drivebase is not None:
+            v, w = self.drivebase.step(t)
+            self.x += v * math.cos(self.h + w * t / 2) * t
+            self.y += v * math.sin(self.h + w * t / 2) * t
+            self.h += w * t
+            old = self.track.ss[self.hint]
+            self.hint, _ = self.track.nearest(self.x, self.y, self.hint)
+            ds = self.track.ss[self.hint] - old
+            if ds < -self.track.length / 2:
+                ds += self.track.length
+            elif ds > self.track.length / 2:
+                ds -= self.track.length
+            self.progress += ds
+        self._update_clamp()
+        self.now_ms += dt
+        self._track_landmarks()
+
+    def _ahead(self, dist):
+        return self.x + dist * math.cos(self.h), self.y + dist * math.sin(self.h)
+
+    def line_surface(self):
+        x, y = self._ahead(LINE_SENSOR_AHEAD)
+        self.sensor_hint, lateral = self.track.nearest(x, y, self.sensor_hint)
+        surface, kind, patch = self.track.surface(self.sensor_hint, lateral)
+        self.sensor_patch = patch
+        if patch is not None and patch is self.worn:
+            return self.track.bare(lateral)
+        return surface, kind, patch
+
+    def _track_landmarks(self):
+        # Ground truth for benchmarks: the line sensor reaching a new patch
+        self.line_surface()
+        patch = self.sensor_patch
+        if self.worn is not None and patch is not self.worn:
+            # Off the worn pad: coming back onto it is a new crossing
+            self.worn = None
+            self.last_patch = None
+        if patch is not None and patch is not self.last_patch:
+            kind = patch[5]
+            self.worn = None
+            if kind == "station" and self.worn_pads and self.rng.random() < self.worn_pads:
+                self.worn = patch
+            self.log(kind + "_enter", station=patch[6], worn=self.worn is patch)
+            self.last_patch = patch
+
+    def ultrasonic(self):
+        sx, sy = self._ahead(ULTRASONIC_AHEAD)
+        best = 2550.0
+        targets = [(o.x, o.y, o.radius) for o in self.objects]
+        targets += list(self.bins.values())
+        for cx, cy, radius in targets:
+            dx, dy = cx - sx, cy - sy
+            along = dx * math.cos(self.h) + dy * math.sin(self.h)
+            side = -dx * math.sin(self.h) + dy * math.cos(self.h)
+            if along > 0 and abs(side) < radius + along * math.tan(math.radians(12)):
+                best = min(best, max(0.0, math.hypot(dx, dy) - radius))
+        return best
+
+    def _update_clamp(self):
+        clamp = self.motors.get(Port.A)
+        arm = self.motors.get(Port.B)
+        if clamp is None or arm is None:
+            return
+        if self.held is not None:
+            obj = self.held
+            if clamp.phys > obj.jaw_angle + 15:
+                self._release(obj)
+                clamp.lo = 0
+            else:
+                clamp.lo = obj.jaw_angle
+            return
+        obj = self._in_jaws() if arm.phys > ARM_DOWN_ZONE else None
+        if obj is not None and clamp.phys >= obj.jaw_angle + 5:
+            self.candidate = obj
+        elif obj is None:
+            self.candidate = None
+        if self.candidate is not None:
+            clamp.lo = self.candidate.jaw_angle
+            if clamp.phys <= self.candidate.jaw_angle + 0.5:
+                self.held = self.candidate
+                self.candidate = None
+                self.objects.remove(self.held)
+                self.held.picked_at = self.now_ms
+                self.log("pickup", material=self.held.material)
+        else:
+            clamp.lo = 0
+
+    def _in_jaws(self):
+        for obj in self.objects:
+            dx, dy = obj.x - self.x, obj.y - self.y
+            along = dx * math.cos(self.h) + dy * math.sin(self.h)
+            side = -dx * math.sin(self.h) + dy * math.cos(self.h)
+            if GRAB_NEAR <= along <= GRAB_FAR and abs(side) <= GRAB_SIDE:
+                return obj
+        return None
+
+    def _release(self, obj):
+        self.held = None
+        gx, gy = self._ahead((GRAB_NEAR + GRAB_FAR) / 2)
+        for station, (bx, by, _) in self.bins.items():
+            if math.hypot(bx - gx, by - gy) <= BIN_REACH:
+                correct = STATION_OF.get(obj.material) == station
+                self.sorted.append((self.now_ms, obj.material, station, correct, obj.picked_at))
+                self.log("drop", material=obj.material, station=station, correct=correct)
+                if obj.spawn is not None:
+                    # Put the next material in its place so every bin gets used
+                    self.spawn(NEXT_MATERIAL[obj.material], obj.spawn)
+                return
+        obj.x, obj.y = gx, gy
+        self.objects.append(obj)
+        self.log("drop_floor", material=obj.material)
+
+    def clamp_surface(self):
+        if self.held is not None:
+            return MATERIALS[self.held.material]
+        return NOTHING
+
+    def noisy(self, value, lo=0, hi=100):
+        return int(round(min(hi, max(lo, value + self.rng.gauss(0, self.noise)))))
+
+# Material -> station id whose bin it belongs in (config.STATION_SEQUENCE)
+STATION_OF = {"Plastic": 1, "Others": 2, "Paper": 3}
+# What a sorted object is replaced with
+NEXT_MATERIAL = {"Plastic": "Paper", "Paper": "Others", "Others": "Plastic"}
+
+class SimControl:
+    def __init__(self, motor):
+        self.motor = motor
+        self._limits = [motor.max_speed, 2000, 100]
+
+    def done(self):
+        return self.motor.mode in ("hold", "coast", "brake") or self.motor.stalled_for >= 0.2
+
+    def stalled(self):
+        return self.motor.stalled_for >= 0.1
+
+    def limits(self, speed=None, acceleration=None, actuation=None):
+        if speed is None and acceleration is None and actuation is None:
+            return tuple(self._limits)
+        if self.motor.mode not in ("coast", "brake"):
+            # As on the brick: settings only change with the controller stopped
+            raise OSError("can't change limits while the motor is {}".format(self.motor.mode))
+        for i, v in enumerate((speed, acceleration, actuation)):
+            if v is not None:
+                self._limits[i] = v
+
+class SimMotor:
+    """Speed-controlled motor with hard stops; angles in degrees."""
+
+    def __init__(self, world, port, lo, hi, max_speed):
+        self.world = world
+        self.port = port
+        self.lo = lo
+        self.hi = hi
+        self.max_speed = max_speed
+        self.phys = 0.0
+        self.offset = 0.0
+        self.vel = 0.0
+        self.mode = "coast"
+        self.cmd_speed = 0.0
+        self.target = 0.0
+        self.then = Stop.HOLD
+        self.stalled_for = 0.0
+        self.control = SimControl(self)
+
+    # pybricks API
+    def angle(self):
+        return int(round(self.phys - self.offset))
+
+    def speed(self):
+        return int(round(self.vel))
+
+    def reset_angle(self, angle=0):
+        self.offset = self.phys - angle
+
+    def stop(self):
+        self.mode = "coast"
+
+    def brake(self):
+        self.mode = "brake"
+
+    def hold(self):
+        self.mode = "hold"
+        self.target = self.phys
+
+    def run(self, speed):
+        self.mode = "run"
+        self.cmd_speed = speed
+        self.stalled_for = 0.0
+
+    def dc(self, duty):
+        self.run(duty / 100 * self.max_speed)
+
+    def run_target(self, speed, target_angle, then=Stop.HOLD, wait=True):
+        self.mode = "target"
+        self.cmd_speed = abs(speed)
+        self.target = target_angle + self.offset
+        self.then = then
+        self.stalled_for = 0.0
+        if wait:
+            while not self.control.done():
+                self.world.wait(self.world.dt)
+
+    def run_angle(self, speed, rotation_angle, then=Stop.HOLD, wait=True):
+        self.run_target(speed, self.angle() + rotation_angle * (1 if speed >= 0 else -1), then, wait)
+
+    def run_time(self, speed, time, then=Stop.HOLD, wait=True):
+        self.run(speed)
+        if wait:
+            self.world.wait(time)
+            self._finish(then)
+
+    def run_until_stalled(self, speed, then=Stop.COAST, duty_limit=None):
+        self.run(speed)
+        while self.stalled_for < 0.1:
+            self.world.wait(self.world.dt)
+        self._finish(then)
+        return self.angle()
+
+    def track_target(self, target_angle):
+        self.mode = "hold"
+        self.target = target_angle + self.offset
+
+    def _finish(self, then):
+        if then == Stop.HOLD:
+            self.hold()
+        elif then == Stop.BRAKE:
+            self.brake()
+        else:
+            self.stop()
+
+    def step(self, t):
+        if self.mode == "run":
+            want = self.cmd_speed
+        elif self.mode == "target":
+            err = self.target - self.phys
+            if abs(err) < 1.0:
+                self.phys = self.target if self._free(self.target) else self.phys
+                self._finish(self.then)
+                want = 0.0
+            else:
+                want = math.copysign(min(self.cmd_speed, 8 * abs(err) + 30), err)
+        elif self.mode == "hold":
+            want = max(-self.max_speed, min(self.max_speed, 10 * (self.target - self.phys)))
+        else:
+            want = 0.0
+        want = max(-self.max_speed, min(self.max_speed, want))
+        accel = self.control._limits[1] * t
+        self.vel += max(-accel, min(accel, want - self.vel))
+        new = self.phys + self.vel * t
+        blocked = False
+        if self.lo is not None and new < self.lo:
+            new, blocked = self.lo, self.vel < 0
+        if self.hi is not None and new > self.hi:
+            new, blocked = self.hi, self.vel > 0
+        if blocked:
+            self.vel = 0.0
+            self.stalled_for += t
+        elif abs(self.vel) > 5:
+            self.stalled_for = 0.0
+        self.phys = new
+
+    def _free(self, angle):
+        return (self.lo is None or angle >= self.lo) and (self.hi is None or angle <= self.hi)
+
+class SimDriveBase:
+    def __init__(self, world, left, right, wheel_diameter, axle_track):
+        self.world = world
+        self.left = left
+        self.right = right
+        self.wheel_diameter = wheel_diameter
+        self.axle_track = axle_track
+        self.v = 0.0            # mm/s
+        self.w = 0.0            # rad/s, counter-clockwise
+        self.cmd_v = 0.0
+        self.cmd_w = 0.0
+        self._settings = [100, 400, 90, 360]
+        self.left_zero = 0.0
+        self.right_zero = 0.0
+
+    def _travel(self, motor):
+        return motor.phys * math.pi * self.wheel_diameter / 360
+
+    def step(self, t):
+        dv = self._settings[1] * 2 * t
+        dw = math.radians(self._settings[3]) * 2 * t
+        self.v += max(-dv, min(dv, self.cmd_v - self.v))
+        self.w += max(-dw, min(dw, self.cmd_w - self.w))
+        half = self.w * self.axle_track / 2
+        for motor, speed in ((self.left, self.v - half), (self.right, self.v + half)):
+            deg = speed * 360 / (math.pi * self.wheel_diameter)
+            motor.vel = deg
+            motor.phys += deg * t
+        return self.v, self.w
+
+    # pybricks API
+    def drive(self, drive_speed, turn_rate):
+        self.cmd_v = drive_speed
+        self.cmd_w = -math.radians(turn_rate)
+
+    def stop(self):
+        self.cmd_v = self.cmd_w = self.v = self.w = 0.0
+
+    def distance(self):
+        l = self._travel(self.left) - self.left_zero
+        r = self._travel(self.right) - self.right_zero
+        return int(round((l + r) / 2))
+
+    def angle(self):
+        l = self._travel(self.left) - self.left_zero
+        r = self._travel(self.right) - self.right_zero
+        return int(round(math.degrees((l - r) / self.axle_track)))
+
+    def state(self):
+        return (self.distance(), int(self.v), self.angle(), int(-math.degrees(self.w)))
+
+    def reset(self):
+        self.left_zero = self._travel(self.left)
+        self.right_zero = self._travel(self.right)
+
+    def settings(self, straight_speed=None, straight_acceleration=None, turn_rate=None,
+                 turn_acceleration=None):
+        values = (straight_speed, straight_acceleration, turn_rate, turn_acceleration)
+        if all(v is None for v in values):
+            return tuple(self._settings)
+        for i, v in enumerate(values):
+            if v is not None:
+                self._settings[i] = v
+
+    def straight(self, distance):
+        start = self.distance()
+        self.drive(math.copysign(self._settings[0], distance), 0)
+        while abs(self.distance() - start) < abs(distance):
+            self.world.wait(self.world.dt)
+        self.stop()
+
+    def turn(self, angle):
+        start = self.angle()
+        self.drive(0, math.copysign(self._settings[2], angle))
+        while abs(self.angle() - start) < abs(angle):
+            self.world.wait(self.world.dt)
+        self.stop()
+
+class SimColorSensor:
+    def __init__(self, world, port):
+        self.world = world
+        self.port = port
+        self.mode = None
+
+    def _read(self, mode):
+        cost = self.world.read_ms
+        if mode != self.mode:
+            self.mode = mode
+            cost += self.world.switch_ms
+        self.world.wait(cost)
+        if self.port == Port.S2:
+            return self.world.clamp_surface()
+        return self.world.line_surface()[0]
+
+    def color(self):
+        return self._read("COL-COLOR")[0]
+
+    def reflection(self):
+        return self.world.noisy(self._read("COL-REFLECT")[1])
+
+    def ambient(self):
+        self._read("COL-AMBIENT")
+        return self.world.noisy(3)
+
+    def rgb(self):
+        r, g, b = self._read("RGB-RAW")[2]
+        return (self.world.noisy(r), self.world.noisy(g), self.world.noisy(b))
+
+class SimUltrasonicSensor:
+    def __init__(self, world, port):
+        self.world = world
+        self.port = port
+
+    def distance(self, silent=False):
+        w = self.world
+        w.wait(w.read_ms)
+        if w.ghost_echo and w.rng.random() < w.ghost_echo:
+            return w.rng.randint(20, 60)
+        return w.noisy(w.ultrasonic(), 0, 2550)
+
+    def presence(self):
+        return False
+
+class SimSpeaker:
+    def __init__(self, world):
+        self.world = world
+        self.phrases = []
+
+    def _busy(self, ms):
+        self.world.wait(ms)
+
+    def say(self, text):
+        self.phrases.append((self.world.now(), text))
+        self._busy(self.world.speech_ms + self.world.speech_char_ms * len(text))
+
+    def play_file(self, path):
+        self._busy(self.world.speech_char_ms * 12)
+
+    def beep(self, frequency=500, duration=100):
+        self._busy(duration)
+
+    def set_volume(self, volume, which="_all_"):
+        pass
+
+    def set_speech_options(self, language=None, voice=None, speed=None, pitch=None):
+        pass
+
+class SimButtons:
+    def __init__(self, world):
+        self.world = world
+
+    def pressed(self):
+        w = self.world
+        # One 100 ms press of CENTER when the program first asks (start),
+        # then CENTER again once the run's stop condition is met
+        if w.start_press is None:
+            w.start_press = w.now()
+        if w.now() - w.start_press < 100 or w.finished():
+            return [Button.CENTER]
+        return []
+
+class SimLight:
+    def __init__(self):
+        self.color = None
+
+    def on(self, color):
+        self.color = color
+
+    def off(self):
+        self.color = None
+
+class SimScreen:
+    def clear(self):
+        pass
+
+    def draw_text(self, x, y, text, text_color=None, background_color=None):
+        pass
+
+    def print(self, *args, **kwargs):
+        pass
+
+    def load_image(self, source):
+        pass
+
+    def draw_image(self, x, y, source, transparent=None):
+        pass
+
+class SimBattery:
+    def voltage(self):
+        return 7800
+
+    def current(self):
+        return 200
+
+class SimBrick:
+    def __init__(self, world):
+        self.speaker = SimSpeaker(world)
+        self.buttons = SimButtons(world)
+        self.light = SimLight()
+        self.screen = SimScreen()
+        self.battery = SimBattery()
@@ -0,0 +1,194 @@
+# speech.py
+# Non-blocking announcements: say() queues the text and returns at once, a
+# background thread does the (slow) text-to-speech while the robot keeps moving.
+# Phrases are rendered to .wav once by PhraseCache and played from disk after.
+# beep() goes through the same queue, so only the worker touches the speaker.
+import _thread
+import os
+from pybricks.tools import wait
+import config
+import hardware
+
+# Phrases spoken outside the station/material names (see actions.py, main.py)
+FIXED_PHRASES = ["Initialize", "Clamp", "Press center", "Object", "Dropping",
+                 "Shutdown", "None", "Others"]
+
+BEEP = "\a"  # queued in place of a phrase: the worker beeps instead of speaking
+
+def vocabulary():
+    phrases = list(FIXED_PHRASES)
+    for phrase in config.STATION_ANNOUNCE:
+        phrases.append(phrase)
+    for entry in config.TRASH_DB:
+        if entry[0] not in phrases:
+            phrases.append(entry[0])
+    return phrases
+
+def _fnv1a(text):
+    h = 0x811c9dc5
+    for ch in text.encode():
+        h = ((h ^ ch) * 0x01000193) & 0xffffffff
+    return h
+
+def _exists(path):
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
+
+def _listdir(path):
+    try:
+        return [entry[0] for entry in os.ilistdir(path)]
+    except AttributeError:
+        return os.listdir(path)
+
+def espeak_render(text, path):
+    # Same engine and options the brick uses for speaker.say()
+    voice = config.SPEECH_LANGUAGE
+    if config.SPEECH_VOICE:
+        voice += "+" + config.SPEECH_VOICE
+    cmd = 'espeak -a 200 -v {} -s {} -p {} -w "{}" "{}"'.format(
+        voice, config.SPEECH_SPEED, config.SPEECH_PITCH, path, text.replace('"', ''))
+    return os.system(cmd) == 0
+
+class PhraseCache:
+    """Plays phrases from pre-rendered .wav files, rendering on first use.
+
+    Files are keyed by a hash of the text and every voice setting, so
+    changing SPEECH_* in config.py (or bumping SPEECH_CACHE_VERSION) makes
+    old files unreachable; warm_up() deletes them.
+    """
+
+    def __init__(self, speaker, directory=config.SPEECH_CACHE_DIR, render=espeak_render):
+        self.speaker = speaker
+        self.directory = directory
+        self.render = render
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, text):
+        key = "{}|{}|{}|{}|{}|{}".format(config.SPEECH_CACHE_VERSION, config.SPEECH_LANGUAGE,
+                                         config.SPEECH_VOICE, config.SPEECH_SPEED,
+                                         config.SPEECH_PITCH, text)
+        return "{}/{:08x}.wav".format(self.directory, _fnv1a(key))
+
+    def ensure(self, text):
+        # Renders text if needed; returns the .wav path or None on failure
+        path = self.path(text)
+        if _exists(path):
+            return path
+        if not _exists(self.directory):
+            os.mkdir(self.directory)
+        tmp = path + ".tmp"
+        if not self.render(text, tmp):
+            return None
+        os.rename(tmp, path)
+        return path
+
+    def warm_up(self, phrases):
+        keep = []
+        for text in phrases:
+            path = self.ensure(text)
+            if path:
+                keep.append(path.split("/")[-1])
+        for name in _listdir(self.directory):
+            if name not in keep:
+                os.remove(self.directory + "/" + name)
+
+    def speak(self, text):
+        path = self.path(text)
+        if _exists(path):
+            self.hits += 1
+        else:
+            self.misses += 1
+            path = self.ensure(text)
+        if path:
+            self.speaker.play_file(path)
+        else:
+            self.speaker.say(text)
+
+class Announcer:
+    """Speaks queued phrases on a worker thread.
+
+    The queue is bounded: a phrase that is already waiting is not queued twice
+    (coalesced), and when the queue is full the oldest waiting phrase is
+    dropped, since a stale announcement is worse than a missing one.
+    """
+
+    def __init__(self, speak, size=config.SPEECH_QUEUE_SIZE, beep=None):
+        self.speak = speak
+        self.beep = beep
+        self.size = size
+        self.queue = []
+        self.speaking = False
+        self.spoken = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self._mutex = _thread.allocate_lock()
+        self._ready = _thread.allocate_lock()
+        self._ready.acquire()
+        self._started = False
+
+    def say(self, text):
+        with self._mutex:
+            if text in self.queue:
+                self.coalesced += 1
+                return
+            if len(self.queue) >= self.size:
+                self.queue.pop(0)
+                self.dropped += 1
+            self.queue.append(text)
+            if not self._started:
+                self._started = True
+                _thread.start_new_thread(self._worker, ())
+            if self._ready.locked():
+                self._ready.release()
+
+    def busy(self):
+        return self.speaking or len(self.queue) > 0
+
+    def wait_idle(self):
+        # Blocks until everything queued so far has been spoken
+        while self.busy():
+            wait(20)
+
+    def _worker(self):
+        while True:
+            self._ready.acquire()
+            while True:
+                with self._mutex:
+                    if not self.queue:
+                        break
+                    text = self.queue.pop(0)
+                    self.speaking = True
+                try:
+                    if text == BEEP:
+                        if self.beep is not None:
+                            self.beep()
+                    else:
+                        self.speak(text)
+                        self.spoken += 1
+                except Exception as e:
+                    print("[SPEECH] " + str(e))
+                self.speaking = False
+
+hardware.ev3.speaker.set_speech_options(config.SPEECH_LANGUAGE, config.SPEECH_VOICE,
+                                        config.SPEECH_SPEED, config.SPEECH_PITCH)
+if config.SPEECH_CACHE:
+    cache = PhraseCache(hardware.ev3.speaker)
+    announcer = Announcer(cache.speak, beep=hardware.ev3.speaker.beep)
+else:
+    cache = None
+    announcer = Announcer(hardware.ev3.speaker.say, beep=hardware.ev3.speaker.beep)
+
+def say(text):
+    announcer.say(text)
+
+def beep():
+    announcer.say(BEEP)
+
+def warm_up():
+    # Renders any phrase of the fixed vocabulary that is not on disk yet
+    if cache is not None:
+        cache.warm_up(vocabulary())
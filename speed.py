@@ -0,0 +1,55 @@
+# speed.py
+# Forward speed from the recent steering error: the mean |ref - THRESHOLD|
+# over the last config.SPEED_WINDOW ticks is small on straights (speed up to
+# the cap) and large in curves (down to SPEED_MIN), with separate
+# acceleration/deceleration limits. All integer math, nothing allocated.
+# Off by default: bench/bench_mission.py --set ADAPTIVE_SPEED=True to compare.
+import config
+
+class SpeedScheduler:
+    def __init__(self, period_ms):
+        self.window = bytearray(config.SPEED_WINDOW)  # |error| ring, 0-100
+        self.pos = 0
+        self.total = 0
+        # speed in 1/100 mm/s, so per-tick steps stay integers
+        self.up = config.SPEED_ACCEL * period_ms // 10
+        self.down = config.SPEED_DECEL * period_ms // 10
+        self.speed = config.SPEED_MIN * 100
+
+    def reset(self):
+        # After a stop: forget the old curve, start again from SPEED_MIN
+        for i in range(len(self.window)):
+            self.window[i] = 0
+        self.total = 0
+        self.speed = config.SPEED_MIN * 100
+
+    def update(self, error, cap):
+        # error: ref - THRESHOLD this tick; cap: the fastest allowed here (mm/s)
+        if error < 0:
+            error = -error
+        if error > 100:
+            error = 100
+        self.total += error - self.window[self.pos]
+        self.window[self.pos] = error
+        self.pos += 1
+        if self.pos == len(self.window):
+            self.pos = 0
+
+        low = config.SPEED_ERR_LOW * len(self.window)
+        high = config.SPEED_ERR_HIGH * len(self.window)
+        lo_speed = config.SPEED_MIN * 100
+        hi_speed = cap * 100
+        if error >= config.SPEED_MAX_ERROR or self.total >= high:
+            target = lo_speed
+        elif self.total <= low:
+            target = hi_speed
+        else:
+            target = hi_speed - (hi_speed - lo_speed) * (self.total - low) // (high - low)
+
+        if target > self.speed:
+            self.speed = min(target, self.speed + self.up)
+        else:
+            self.speed = max(target, self.speed - self.down)
+        if self.speed > hi_speed:
+            self.speed = hi_speed
+        return self.speed // 100
@@ -0,0 +1,33 @@
+# stations.py
+# Station definitions (config.STATIONS) compiled once into a dense table
+# indexed by (color code, reflection 0-100), so the per-tick station check is
+# a single indexed read instead of list membership tests and range compares.
+import config
+import sensing
+
+class StationTable:
+    """rows[id][cell] is 1 when station id matches the sample in cell
+    (sensing.ColorSampler.cell), ids[cell] lists every matching station."""
+
+    def __init__(self, stations=None):
+        if stations is None:
+            stations = config.STATIONS
+        size = len(sensing.COLORS) * sensing.REFL_STEPS
+        self.count = len(stations)
+        self.rows = [bytearray(size)]  # row 0: "no station", never matches
+        for colors, lo, hi in stations:
+            row = bytearray(size)
+            for color in colors:
+                base = sensing.color_code(color) * sensing.REFL_STEPS
+                for ref in range(max(lo, 0), min(hi, 100) + 1):
+                    row[base + ref] = 1
+            self.rows.append(row)
+
+        self.ids = [()] * size
+        shared = {}
+        for cell in range(size):
+            hits = tuple([i for i in range(1, self.count + 1) if self.rows[i][cell]])
+            if hits:
+                if hits not in shared:
+                    shared[hits] = hits
+                self.ids[cell] = shared[hits]
@@ -0,0 +1,83 @@
+# telemetry.py
+# One fixed-size binary record per mission event (pickup, identify result,
+# station arrival, drop), kept in a preallocated buffer and appended to
+# config.TELEMETRY_FILE in one write at station stops and at shutdown.
+# tools/telemetry_dump.py decodes the file on a PC.
+try:
+    import ustruct as struct
+except ImportError:
+    import struct
+from pybricks.tools import StopWatch
+import config
+
+# time ms, duration ms, event, station, item, color code, reflection, confidence %
+RECORD = "<IIBBBBBB"
+RECORD_SIZE = struct.calcsize(RECORD)
+# Starts every mission's block in the file, followed by the item labels
+MAGIC = b"TLM1"
+
+# Events
+START = 1      # duration: program start to ready (actions.ready_ms)
+PICKUP = 2     # duration: pick motions
+IDENTIFY = 3   # item/color/reflection/confidence; duration: sampling
+ARRIVE = 4     # station, held item; duration: since leaving the last station
+DROP = 5       # station, item; duration: unload sequence
+STOP = 6
+PASS = 7       # station rolled past without stopping (SKIP_STOP); as ARRIVE
+MISSED = 8     # station passed unseen (corner checkpoint), held item; duration: backing up
+
+class Telemetry:
+    """Records go into buf with pack_into; nothing is allocated per event."""
+
+    def __init__(self, path, records):
+        self.path = path
+        self.buf = bytearray(RECORD_SIZE * records)
+        self.used = 0
+        self.watch = StopWatch()
+        self.header = None
+        self.written = 0
+
+    def start(self, labels, ready_ms=0):
+        # labels: item names, indexed by the item field (classifier labels)
+        text = ",".join(labels).encode()
+        self.header = MAGIC + struct.pack("<H", len(text)) + text
+        self.watch.reset()
+        self.log(START, duration=max(0, ready_ms))
+
+    def now(self):
+        return self.watch.time()
+
+    def log(self, event, duration=0, station=0, item=0, color=0, reflection=0, confidence=0):
+        if self.used + RECORD_SIZE > len(self.buf):
+            self.flush()
+        struct.pack_into(RECORD, self.buf, self.used, self.watch.time(), duration,
+                         event, station, item, color, reflection, confidence)
+        self.used += RECORD_SIZE
+
+    def flush(self):
+        if self.used == 0 and self.header is None:
+            return
+        with open(self.path, "ab") as f:
+            if self.header is not None:
+                f.write(self.header)
+                self.header = None
+            f.write(memoryview(self.buf)[:self.used])
+        self.written += self.used // RECORD_SIZE
+        self.used = 0
+
+recorder = Telemetry(config.TELEMETRY_FILE, config.TELEMETRY_RECORDS) if config.TELEMETRY else None
+
+def start(labels, ready_ms=0):
+    if recorder is not None:
+        recorder.start(labels, ready_ms)
+
+def now():
+    return recorder.now() if recorder is not None else 0
+
+def log(event, duration=0, station=0, item=0, color=0, reflection=0, confidence=0):
+    if recorder is not None:
+        recorder.log(event, duration, station, item, color, reflection, confidence)
+
+def flush():
+    if recorder is not None:
+        recorder.flush()
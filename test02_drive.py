@@ -4,6 +4,8 @@ from pybricks.tools import wait
 import hardware
 import config
 
+TURN_GAIN = -1.2  # P-only follower, as config.PID_GAINS[0] (kp -1200 / 1000)
+
 print("--- LINE FOLLOW TEST ---")
 print("Press CENTER to stop")
 
@@ -16,7 +18,7 @@ while True:
     
     # 2. Calculate Turn
     # If ref is high (white), turn left. If low (black), turn right.
-    turn_rate = (ref - config.THRESHOLD) * config.TURN_GAIN
+    turn_rate = (ref - config.THRESHOLD) * TURN_GAIN
     
     # 3. Drive
     hardware.robot.drive(config.DRIVE_SPEED, turn_rate)
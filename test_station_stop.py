@@ -4,6 +4,8 @@ from pybricks.tools import wait
 import hardware
 import config
 
+TURN_GAIN = -1.2  # P-only follower, as config.PID_GAINS[0] (kp -1200 / 1000)
+
 print("--- 3 STATION TEST + LOGS ---")
 print("Press CENTER to stop")
 
@@ -61,7 +63,7 @@ while True:
         hardware.robot.reset()
 
     # 7. SMOOTH LINE FOLLOWING
-    turn_rate = (ref - config.THRESHOLD) * config.TURN_GAIN
+    turn_rate = (ref - config.THRESHOLD) * TURN_GAIN
     hardware.robot.drive(config.DRIVE_SPEED, turn_rate)
     
     # 8. EXIT
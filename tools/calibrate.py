@@ -0,0 +1,346 @@
+# calibrate.py
+# Offline calibration compiler: reads labeled sensor dumps (data_logger.py
+# output with "== LABEL ==" headers, like readings.txt), builds per-class
+# color/reflection histograms, picks the reflection window that best separates
+# each station (and trash class) from everything else, and writes a generated
+# calibration.py that config.py picks up, plus a separability report.
+# With --fit-rgb it also fits the RGB_REFL_WEIGHTS / RGB_HUE_BANDS that
+# sensing.py uses with config.LINE_RGB, from the R | G | B columns recorded
+# next to color() and reflection() at the same spot, and reports how well
+# sensing.classify / sensing.reflection then agree with the mode reads. With
+# --line-rgb (the default when config.LINE_RGB is set) the station windows are
+# built from those columns too, through sensing.classify / sensing.reflection
+# with the fitted settings, since that is what ColorSampler.cell holds then.
+#
+#   python3 tools/calibrate.py readings.txt \
+#       --station "DARK BLUE STATION=2" --station "ORANGE STATION=3" \
+#       --background BLANK --fit-rgb -o calibration.py
+import argparse
+import datetime
+import os
+import re
+import sys
+
+import numpy as np
+
+# sensing.py / config.py as on the brick, through the pybricks stand-ins in sim/
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _p in (ROOT, os.path.join(ROOT, "sim")):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+import config   # noqa: E402
+import sensing  # noqa: E402
+
+# Same numbering as sensing.COLORS (the EV3 color codes, see info.txt)
+COLOR_NAMES = ["None", "BLACK", "BLUE", "GREEN", "YELLOW", "RED", "WHITE", "BROWN"]
+REFL_STEPS = 101
+
+HEADER = re.compile(r"^\s*==\s*(.*?)\s*==\s*$")
+
+def parse_color(field):
+    # "Color.BLUE", "None" and clipped dumps like "olor.YELLOW"
+    field = field.strip()
+    if field == "None":
+        return 0
+    if "." in field:
+        name = field.rsplit(".", 1)[1].upper()
+        if name in COLOR_NAMES:
+            return COLOR_NAMES.index(name)
+    return None
+
+def read_samples(lines):
+    """Yields (label, color code, reflection, rgb) one line at a time.
+
+    Rows are "Color | Refl | Amb" (data_logger.py) optionally preceded by a
+    distance column; anything else (banners, column titles) is skipped. rgb is
+    the (r, g, b) of "Color | Refl | Amb | R | G | B" rows, None in older dumps.
+    """
+    label = ""
+    for line in lines:
+        match = HEADER.match(line)
+        if match:
+            label = match.group(1).strip().upper()
+            continue
+        fields = line.split("|")
+        for i in range(len(fields) - 1):
+            code = parse_color(fields[i])
+            if code is None:
+                continue
+            try:
+                ref = int(float(fields[i + 1]))
+            except ValueError:
+                break
+            try:
+                rgb = tuple(int(float(v)) for v in fields[i + 3:i + 6])
+            except ValueError:
+                rgb = ()
+            if label and 0 <= ref <= 100:
+                yield label, code, ref, rgb if len(rgb) == 3 else None
+            break
+
+def histograms(paths, line_rgb=False):
+    # label -> (colors x reflection) count matrix, built while streaming;
+    # line_rgb: from the R | G | B columns as sensing.py derives them with
+    # config.LINE_RGB (rows without them are skipped)
+    hist = {}
+    for path in paths:
+        with open(path) as f:
+            for label, code, ref, rgb in read_samples(f):
+                if line_rgb:
+                    if rgb is None:
+                        continue
+                    code = sensing.classify(*rgb)
+                    ref = sensing.reflection(*rgb)
+                if label not in hist:
+                    hist[label] = np.zeros((len(COLOR_NAMES), REFL_STEPS), dtype=np.int64)
+                hist[label][code, ref] += 1
+    return hist
+
+def class_stats(h):
+    refs = np.arange(REFL_STEPS)
+    per_ref = h.sum(axis=0)
+    total = per_ref.sum()
+    cdf = np.cumsum(per_ref) / total
+    pct = {p: int(np.searchsorted(cdf, p / 100)) for p in (5, 50, 95)}
+    mean = float((per_ref * refs).sum() / total)
+    std = float(np.sqrt((per_ref * (refs - mean) ** 2).sum() / total))
+    colors = {COLOR_NAMES[c]: int(n) for c, n in enumerate(h.sum(axis=1)) if n}
+    return {"n": int(total), "mean": mean, "std": std, "pct": pct, "colors": colors}
+
+def best_window(positive, negative, colors, fp_weight, margin):
+    """Reflection window [lo, hi] for the given colors maximising
+    (share of positives inside) - fp_weight * (share of negatives inside).
+    Ties go to the narrowest window, which is then widened by margin where
+    that does not admit any negative sample."""
+    pos = positive[colors].sum(axis=0)
+    neg = negative[colors].sum(axis=0)
+    pos_total = max(positive.sum(), 1)
+    neg_total = max(negative.sum(), 1)
+    pos_c = np.concatenate([[0], np.cumsum(pos)])
+    neg_c = np.concatenate([[0], np.cumsum(neg)])
+    # inside[lo, hi] = counts with lo <= ref <= hi, via prefix sums
+    tp = (pos_c[None, 1:] - pos_c[:-1, None]) / pos_total
+    fp = (neg_c[None, 1:] - neg_c[:-1, None]) / neg_total
+    width = np.arange(REFL_STEPS)[None, :] - np.arange(REFL_STEPS)[:, None]
+    score = tp - fp_weight * fp - 1e-6 * width
+    score[np.tril_indices(REFL_STEPS, -1)] = -np.inf
+    lo, hi = (int(v) for v in np.unravel_index(np.argmax(score), score.shape))
+    for _ in range(margin):
+        if lo > 0 and neg[lo - 1] == 0:
+            lo -= 1
+        if hi < REFL_STEPS - 1 and neg[hi + 1] == 0:
+            hi += 1
+    return lo, hi, float(tp[lo, hi]), float(fp[lo, hi])
+
+def rgb_samples(paths):
+    # (codes, reflections, rgb) arrays of every row with R | G | B columns
+    rows = []
+    for path in paths:
+        with open(path) as f:
+            rows += [(code, ref) + rgb for _, code, ref, rgb in read_samples(f) if rgb]
+    data = np.array(rows, dtype=np.int64).reshape(-1, 5)
+    return data[:, 0], data[:, 1], data[:, 2:]
+
+def fit_refl_weights(refs, rgb):
+    """RGB_REFL_WEIGHTS (% of R, G, B): least squares of reflection on the
+    channels, over the channel subsets whose fit has no negative weight."""
+    best = None
+    for mask in range(1, 8):
+        cols = [c for c in range(3) if mask >> c & 1]
+        w, _, _, _ = np.linalg.lstsq(rgb[:, cols].astype(float), refs.astype(float), rcond=None)
+        if (w < 0).any():
+            continue
+        weights = [0, 0, 0]
+        for c, v in zip(cols, w):
+            weights[c] = int(round(v * 100))
+        err = np.abs(np.clip((rgb @ weights) // 100, 0, 100) - refs).mean()
+        if best is None or err < best[1]:
+            best = (tuple(weights), float(err))
+    return best
+
+def hues(rgb):
+    # Hue exactly as sensing.classify computes it (integer math, floor division)
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    hi = rgb.max(axis=1)
+    chroma = np.maximum(hi - rgb.min(axis=1), 1)
+    hue = np.where(hi == r, (60 * (g - b)) // chroma % 360,
+                   np.where(hi == g, 120 + (60 * (b - r)) // chroma,
+                            240 + (60 * (r - g)) // chroma))
+    # ... and only where classify gets as far as the hue
+    chromatic = (hi >= config.RGB_BLACK_MAX) & \
+        ((hi - rgb.min(axis=1)) * 100 >= hi * config.RGB_MIN_SATURATION)
+    return hue, chromatic
+
+def split(below, above, lo, hi):
+    """Hue boundary in (lo, hi) with the fewest of below at or over it plus
+    above under it; the middle of the best run of boundaries."""
+    t = np.arange(lo + 1, hi)
+    errors = (below[None, :] >= t[:, None]).sum(axis=1) + (above[None, :] < t[:, None]).sum(axis=1)
+    best = np.flatnonzero(errors == errors.min())
+    return int(t[best[len(best) // 2]]), int(errors.min())
+
+def fit_hue_bands(codes, rgb, bands):
+    """RGB_HUE_BANDS boundaries RED|YELLOW|GREEN|BLUE|RED from the hues of
+    the samples color() called one of those; a boundary next to a color with
+    no samples keeps its configured value."""
+    hue, chromatic = hues(rgb)
+    red = hue[chromatic & (codes == sensing.RED)]
+    by_code = {code: hue[chromatic & (codes == code)]
+               for code in (sensing.YELLOW, sensing.GREEN, sensing.BLUE)}
+    # Red wraps around 360: low hues border yellow, high hues border blue
+    order = [red[red < 180], by_code[sensing.YELLOW], by_code[sensing.GREEN],
+             by_code[sensing.BLUE], red[red >= 180]]
+    fitted = []
+    errors = 0
+    lo = 0
+    for i, (upper, code) in enumerate(bands[:-1]):
+        below, above = order[i], order[i + 1]
+        if len(below) and len(above):
+            upper, wrong = split(below, above, lo, 360)
+            errors += wrong
+        fitted.append((upper, code))
+        lo = upper
+    return fitted + [bands[-1]], errors
+
+def main_colors(h, share):
+    counts = h.sum(axis=1)
+    return [c for c in range(len(COLOR_NAMES)) if counts[c] >= share * counts.sum()]
+
+def parse_mapping(items, what):
+    mapping = {}
+    for item in items:
+        if "=" not in item:
+            sys.exit("--{} expects LABEL=VALUE, got {!r}".format(what, item))
+        label, value = item.rsplit("=", 1)
+        mapping[label.strip().upper()] = value.strip()
+    return mapping
+
+def color_list(codes):
+    return "[" + ", ".join("None" if c == 0 else "Color." + COLOR_NAMES[c] for c in codes) + "]"
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive station/trash thresholds from labeled sensor dumps")
+    parser.add_argument("dumps", nargs="+", help="data_logger.py output files")
+    parser.add_argument("--station", action="append", default=[], metavar="LABEL=ID",
+                        help="dump label that is station ID (repeatable)")
+    parser.add_argument("--trash", action="append", default=[], metavar="LABEL=NAME",
+                        help="dump label that is trash material NAME, in TRASH_DB order")
+    parser.add_argument("--background", action="append", default=[], metavar="LABEL",
+                        help="label that must not match any station (floor, line, ...)")
+    parser.add_argument("--color-share", type=float, default=0.1,
+                        help="colors seen in at least this share of a class are accepted")
+    parser.add_argument("--fp-weight", type=float, default=2.0,
+                        help="cost of accepting a foreign sample relative to missing an own one")
+    parser.add_argument("--margin", type=int, default=3,
+                        help="widen each window by up to this many reflection points")
+    parser.add_argument("--fit-rgb", action="store_true",
+                        help="also fit RGB_REFL_WEIGHTS / RGB_HUE_BANDS from the R | G | B columns")
+    parser.add_argument("--line-rgb", action=argparse.BooleanOptionalAction, default=config.LINE_RGB,
+                        help="station windows for the RGB-mode line sensor (default: config.LINE_RGB)")
+    parser.add_argument("-o", "--output", help="write the generated module here (default: stdout)")
+    args = parser.parse_args()
+
+    stations = {k: int(v) for k, v in parse_mapping(args.station, "station").items()}
+    trash = parse_mapping(args.trash, "trash")
+    background = [b.strip().upper() for b in args.background]
+
+    hist = histograms(args.dumps)
+    empty = np.zeros((len(COLOR_NAMES), REFL_STEPS), dtype=np.int64)
+    for label in list(stations) + list(trash) + background:
+        if label not in hist:
+            sys.exit("label {!r} not found; dumps contain: {}".format(label, ", ".join(sorted(hist))))
+
+    report = ["# Separability report", ""]
+    for label in sorted(hist):
+        s = class_stats(hist[label])
+        report.append("{:<48} n={:<4} refl mean {:5.1f} sd {:4.1f} p5/p50/p95 {}/{}/{}  {}".format(
+            label, s["n"], s["mean"], s["std"], s["pct"][5], s["pct"][50], s["pct"][95], s["colors"]))
+    report.append("")
+
+    generated = []
+    if args.fit_rgb:
+        codes, refs, rgb = rgb_samples(args.dumps)
+        if not len(codes):
+            sys.exit("--fit-rgb needs dumps with R | G | B columns (data_logger.py records them)")
+        weights, err = fit_refl_weights(refs, rgb)
+        bands, wrong = fit_hue_bands(codes, rgb, config.RGB_HUE_BANDS)
+        config.RGB_REFL_WEIGHTS = weights
+        config.RGB_HUE_BANDS = bands
+        agree = np.mean([sensing.classify(*s) == c for s, c in zip(rgb.tolist(), codes)])
+        refl_err = np.mean([abs(sensing.reflection(*s) - ref) for s, ref in zip(rgb.tolist(), refs)])
+        generated += ["# RGB mode (config.LINE_RGB), fitted on {} samples: classify agrees with".format(len(codes)),
+                      "# color() on {:.0%}, reflection off by {:.1f} on average".format(agree, refl_err),
+                      "RGB_REFL_WEIGHTS = {}".format(weights),
+                      "RGB_HUE_BANDS = {}".format(bands), ""]
+        report += ["rgb: {} samples  RGB_REFL_WEIGHTS {} (reflection off by {:.1f})".format(
+                       len(codes), weights, err),
+                   "rgb: RGB_HUE_BANDS {} ({} chromatic samples across a boundary)".format(bands, wrong),
+                   "rgb: classify agrees with color() on {:.0%}".format(agree)]
+        for code in sorted(set(codes.tolist())):
+            mine = codes == code
+            got = np.bincount([sensing.classify(*s) for s in rgb[mine].tolist()], minlength=len(COLOR_NAMES))
+            report.append("    color() {:<7} n={:<5} classify {}".format(
+                COLOR_NAMES[code], int(mine.sum()),
+                {COLOR_NAMES[c]: int(n) for c, n in enumerate(got) if n}))
+        report.append("")
+
+    # Station windows are looked up by ColorSampler.cell, i.e. in whatever the
+    # line sensor reads on the brick; the clamp sensor (TRASH_DB) always uses
+    # color()/reflection()
+    line = hist
+    if args.line_rgb:
+        line = histograms(args.dumps, line_rgb=True)
+        for label in list(stations) + background:
+            if label not in line:
+                sys.exit("--line-rgb: label {!r} has no R | G | B rows".format(label))
+        report.append("station windows from rgb() through sensing.classify / sensing.reflection")
+    for label, station_id in sorted(stations.items(), key=lambda kv: kv[1]):
+        others = sum((line[l] for l in list(stations) + background if l != label), empty)
+        colors = main_colors(line[label], args.color_share)
+        lo, hi, tp, fp = best_window(line[label], others, colors, args.fp_weight, args.margin)
+        generated += ["# {} (accepts {:.0%} of its samples, {:.1%} of the others)".format(label, tp, fp),
+                      "STATION_{}_COLOR = {}".format(station_id, color_list(colors)),
+                      "STATION_{}_MIN = {}".format(station_id, lo),
+                      "STATION_{}_MAX = {}".format(station_id, hi), ""]
+        report.append("station {} <- {}: colors {} refl {}-{}  hit {:.0%}  false {:.1%}".format(
+            station_id, label, color_list(colors), lo, hi, tp, fp))
+        for other in list(stations) + background:
+            if other == label:
+                continue
+            o = line[other]
+            inside = o[colors][:, lo:hi + 1].sum() / max(o.sum(), 1)
+            if inside:
+                report.append("    overlaps {:<40} {:.1%} of its samples".format(other, inside))
+
+    if trash:
+        entries = []
+        for label, name in trash.items():
+            others = sum((hist[l] for l in trash if l != label), empty)
+            colors = main_colors(hist[label], args.color_share)
+            lo, hi, tp, fp = best_window(hist[label], others, colors, args.fp_weight, args.margin)
+            entries.append('    ("{}", {}, {}, {}),  # {} hit {:.0%} false {:.1%}'.format(
+                name, lo, hi, color_list(colors), label, tp, fp))
+            report.append("trash {} <- {}: colors {} refl {}-{}  hit {:.0%}  false {:.1%}".format(
+                name, label, color_list(colors), lo, hi, tp, fp))
+        generated += ["TRASH_DB = ["] + entries + ["]", ""]
+
+    unused = [l for l in sorted(hist) if l not in stations and l not in trash and l not in background]
+    if unused:
+        report += ["", "unused labels: " + ", ".join(unused)]
+
+    module = ["# calibration.py",
+              "# GENERATED by tools/calibrate.py on {} from {} - do not edit,".format(
+                  datetime.date.today().isoformat(), ", ".join(args.dumps)),
+              "# re-run the tool instead. Values here override config.py.",
+              "from pybricks.parameters import Color", ""] + generated
+    text = "\n".join(module)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    print("\n".join(report), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
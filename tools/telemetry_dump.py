@@ -0,0 +1,113 @@
+# telemetry_dump.py
+# Decodes the telemetry.bin file written by telemetry.py on the brick: prints
+# every event (or CSV with --csv) and a per-mission summary with sorts, time
+# from pickup to drop and the average duration of each step.
+#
+#   scp robot@ev3dev:telemetry.bin . && python3 tools/telemetry_dump.py telemetry.bin
+import argparse
+import struct
+import sys
+
+# Same layout and codes as telemetry.py
+RECORD = "<IIBBBBBB"
+RECORD_SIZE = struct.calcsize(RECORD)
+MAGIC = b"TLM1"
+EVENTS = {1: "START", 2: "PICKUP", 3: "IDENTIFY", 4: "ARRIVE", 5: "DROP", 6: "STOP",
+          7: "PASS", 8: "MISSED"}
+COLOR_NAMES = ["None", "BLACK", "BLUE", "GREEN", "YELLOW", "RED", "WHITE", "BROWN"]
+
+def read_missions(data):
+    """Splits the file into missions: [(labels, [record tuple, ...]), ...]"""
+    missions = []
+    pos = 0
+    while pos < len(data):
+        if data[pos:pos + 4] == MAGIC:
+            (size,) = struct.unpack_from("<H", data, pos + 4)
+            labels = data[pos + 6:pos + 6 + size].decode().split(",")
+            missions.append((labels, []))
+            pos += 6 + size
+            continue
+        if not missions:
+            raise ValueError("no telemetry header at the start of the file")
+        if pos + RECORD_SIZE > len(data):
+            sys.stderr.write("ignoring {} trailing bytes\n".format(len(data) - pos))
+            break
+        missions[-1][1].append(struct.unpack_from(RECORD, data, pos))
+        pos += RECORD_SIZE
+    return missions
+
+def describe(record, labels):
+    t, duration, event, station, item, color, reflection, confidence = record
+    name = EVENTS.get(event, str(event))
+    label = labels[item] if item < len(labels) else str(item)
+    if name == "IDENTIFY":
+        detail = "{} ({}%)  {} | {}".format(label, confidence, COLOR_NAMES[color], reflection)
+    elif name == "START":
+        detail = "ready after {} ms".format(duration) if duration else ""
+    elif name in ("ARRIVE", "DROP", "PASS", "MISSED"):
+        detail = "station {}  {}".format(station, label)
+    else:
+        detail = ""
+    return "{:9.1f} s  {:8s} {:6d} ms  {}".format(t / 1000, name, duration, detail)
+
+def summarize(records, labels):
+    lines = []
+    end = records[-1][0] if records else 0
+    durations = {}
+    picked_at = None  # the robot holds one item at a time
+    to_bin = {}
+    drops = 0
+    for t, duration, event, station, item, color, reflection, confidence in records:
+        durations.setdefault(event, []).append(duration)
+        if event == 2:
+            picked_at = t - duration
+        elif event == 5:
+            drops += 1
+            if picked_at is not None:
+                label = labels[item] if item < len(labels) else str(item)
+                to_bin.setdefault(label, []).append(t - picked_at)
+                picked_at = None
+    hours = end / 3600000
+    lines.append("mission {:.1f} s   sorts {}   per hour {:.1f}".format(
+        end / 1000, drops, drops / hours if hours else 0))
+    if records and records[0][2] == 1 and records[0][1]:
+        lines.append("  ready after {:.1f} s".format(records[0][1] / 1000))
+    for label, times in sorted(to_bin.items()):
+        lines.append("  time to bin  {:8s} {:6.1f} s (n={})".format(
+            label, sum(times) / len(times) / 1000, len(times)))
+    for event in (2, 3, 4, 5, 7, 8):
+        if event in durations:
+            times = durations[event]
+            lines.append("  {:8s} mean {:7.0f} ms  max {:7d} ms  (n={})".format(
+                EVENTS[event], sum(times) / len(times), max(times), len(times)))
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode telemetry.bin from the robot")
+    parser.add_argument("file")
+    parser.add_argument("--csv", action="store_true", help="one CSV row per event instead")
+    parser.add_argument("--summary", action="store_true", help="only the per-mission summary")
+    args = parser.parse_args()
+
+    with open(args.file, "rb") as f:
+        missions = read_missions(f.read())
+
+    if args.csv:
+        print("mission,time_ms,event,duration_ms,station,item,color,reflection,confidence")
+        for n, (labels, records) in enumerate(missions, 1):
+            for t, duration, event, station, item, color, reflection, confidence in records:
+                print(",".join(str(v) for v in (
+                    n, t, EVENTS.get(event, event), duration, station,
+                    labels[item] if item < len(labels) else item,
+                    COLOR_NAMES[color], reflection, confidence)))
+        return
+
+    for n, (labels, records) in enumerate(missions, 1):
+        print("=== MISSION {} ===".format(n))
+        if not args.summary:
+            for record in records:
+                print(describe(record, labels))
+        print("\n".join(summarize(records, labels)))
+
+if __name__ == "__main__":
+    main()
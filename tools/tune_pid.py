@@ -0,0 +1,177 @@
+# tune_pid.py
+# Fits the config.PID_GAINS table on the simulated track (sim/world.py): for
+# each drive speed (slowest first, each starting from the last one's gains) a
+# pattern search over kp/ki/kd runs main.py for a few laps without objects and
+# keeps the gains with the smallest tracking error that stay on the line.
+# Prints the fastest speed that stays on the line, the lap times, and a
+# PID_GAINS_FITTED line to paste into config.py (opt in on the brick once it
+# holds the real track).
+#
+#   python3 tools/tune_pid.py --speeds 50 80 110 140 --laps 2
+import argparse
+import math
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _p in (ROOT, os.path.join(ROOT, "sim")):
+    if _p not in sys.path:
+        sys.path.insert(0, _p)
+
+import run    # noqa: E402
+import world  # noqa: E402
+
+SAMPLE_MS = 10
+# Search steps (1/1000) and the smallest step worth trying
+STEPS = {"kp": 400, "ki": 4, "kd": 2000}
+MIN_STEPS = {"kp": 25, "ki": 1, "kd": 125}
+
+class LineMonitor:
+    """Wraps World.step: where the line sensor is relative to the edge the
+    follower aims for, how long it is off the line, and when each lap ends."""
+
+    def __init__(self, w, threshold):
+        self.world = w
+        track = w.track
+        # Lateral offset of the sensor (right of the line is negative) at which
+        # the line/floor blend reads THRESHOLD
+        share = (world.FLOOR[1] - threshold) / (world.FLOOR[1] - world.LINE[1])
+        self.target = -(track.line_width / 2 + world.SENSOR_SPOT - 2 * world.SENSOR_SPOT * share)
+        self.hint = 0
+        self.next_sample = 0
+        self.samples = 0
+        self.square_sum = 0.0
+        self.off_ms = 0
+        self.lap_ms = []
+        step = w.step
+        def monitored_step(dt):
+            step(dt)
+            self.sample(dt)
+        w.step = monitored_step
+
+    def sample(self, dt):
+        w = self.world
+        if w.laps() > len(self.lap_ms):
+            self.lap_ms.append(w.now())
+        if w.drivebase is None or w.now() < self.next_sample:
+            return
+        self.next_sample = w.now() + SAMPLE_MS
+        x, y = w._ahead(world.LINE_SENSOR_AHEAD)
+        self.hint, lateral = w.track.nearest(x, y, self.hint)
+        _, kind, _ = w.track.surface(self.hint, lateral)
+        if kind == "floor":
+            self.off_ms += SAMPLE_MS
+        if kind in ("line", "floor"):  # blind on the corner/station patches
+            self.samples += 1
+            self.square_sum += (lateral - self.target) ** 2
+
+    def result(self):
+        laps = [b - a for a, b in zip(self.lap_ms, self.lap_ms[1:])]
+        return {
+            "laps": len(self.lap_ms),
+            "lap_s": sum(laps) / len(laps) / 1000 if laps else None,
+            "rms_mm": math.sqrt(self.square_sum / self.samples) if self.samples else None,
+            "off_ms": self.off_ms,
+        }
+
+def evaluate(speed, kp, ki, kd, laps, overrides, allow_off_ms):
+    """One no-object mission at a fixed speed; (cost, result). The cost is
+    (laps short, ms off the line beyond the allowance, rms error), so the
+    search first gets the robot round the track, then onto the line, then
+    tight on the edge. Only a cost starting (0, 0, ...) stays on the line."""
+    settings = dict(overrides)
+    settings.update({
+        "PID_GAINS": [(speed, kp, ki, kd)],
+        "DRIVE_SPEED": speed,
+        "CRUISE_SPEED": speed,
+        "ADAPTIVE_SPEED": False,
+    })
+    monitors = []
+    def setup(w):
+        import config
+        monitors.append(LineMonitor(w, config.THRESHOLD))
+    # Lap 1 starts after initialize_robot(); allow for a slow robot too
+    stop_ms = 20000 + (laps + 1) * 1000 * 4000 / speed
+    run.run_mission(overrides=settings, stop_ms=stop_ms, laps=laps + 1, objects=[], setup=setup)
+    result = monitors[0].result()
+    result.update({"speed": speed, "kp": kp, "ki": ki, "kd": kd})
+    cost = (laps + 1 - result["laps"], max(0, result["off_ms"] - allow_off_ms * laps),
+            result["rms_mm"] if result["rms_mm"] is not None else math.inf)
+    return cost, result
+
+def on_line(cost):
+    return cost[0] == 0 and cost[1] == 0
+
+def tune(speed, start, laps, iterations, overrides, allow_off_ms, log):
+    """Pattern search: try +-step on each gain, move to the best neighbour if
+    it improves on the current gains, halve the steps when none does."""
+    gains = dict(zip(("kp", "ki", "kd"), start))
+    steps = dict(STEPS)
+    best_cost, best = evaluate(speed, gains["kp"], gains["ki"], gains["kd"], laps, overrides, allow_off_ms)
+    log(best_cost, best)
+    for _ in range(iterations):
+        move = None
+        for name in ("kp", "kd", "ki"):
+            for sign in (1, -1):
+                trial = dict(gains)
+                trial[name] += sign * steps[name]
+                if name in ("ki", "kd") and trial[name] * gains["kp"] < 0:
+                    continue  # same sign as kp or zero
+                cost, result = evaluate(speed, trial["kp"], trial["ki"], trial["kd"], laps, overrides, allow_off_ms)
+                log(cost, result)
+                if cost < best_cost:
+                    best_cost, best, move = cost, result, trial
+        if move is not None:
+            gains = move
+            continue
+        if all(steps[n] <= MIN_STEPS[n] for n in steps):
+            break
+        for n in steps:
+            steps[n] = max(MIN_STEPS[n], steps[n] // 2)
+    return best_cost, best
+
+def show(result):
+    return "speed {speed:4d}  kp {kp:6d}  ki {ki:4d}  kd {kd:6d}  laps {laps}  lap {lap}  rms {rms}  off {off_ms} ms".format(
+        lap="{:6.1f} s".format(result["lap_s"]) if result["lap_s"] else "     - ",
+        rms="{:5.2f} mm".format(result["rms_mm"]) if result["rms_mm"] is not None else "    - ",
+        **result)
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit PID_GAINS on the simulated track")
+    parser.add_argument("--speeds", type=int, nargs="+", default=[50, 80, 110])
+    parser.add_argument("--start", type=int, nargs=3, default=[-1200, 0, 0], metavar=("KP", "KI", "KD"),
+                        help="gains (1/1000) the search starts from at the lowest speed")
+    parser.add_argument("--laps", type=int, default=2, help="timed laps per trial")
+    parser.add_argument("--iterations", type=int, default=12)
+    parser.add_argument("--allow-off", type=int, default=2000, metavar="MS",
+                        help="time per lap the sensor may spend on the floor")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a config.py setting in every trial")
+    parser.add_argument("--verbose", action="store_true", help="print every trial")
+    args = parser.parse_args()
+    overrides = run.parse_overrides(args.set)
+
+    def log(cost, result):
+        if args.verbose:
+            print(("  " if on_line(cost) else "x ") + show(result))
+
+    rows = []
+    start = args.start
+    for speed in sorted(args.speeds):
+        cost, best = tune(speed, start, args.laps, args.iterations, overrides,
+                          args.allow_off, log)
+        print(("" if on_line(cost) else "LOST ") + show(best))
+        if on_line(cost):
+            rows.append(best)
+            start = [best["kp"], best["ki"], best["kd"]]  # next speed starts here
+
+    if not rows:
+        print("No speed stayed on the line")
+        return
+    fastest = max(rows, key=lambda r: r["speed"])
+    print("Fastest on the line: {} mm/s, {:.1f} s per lap".format(fastest["speed"], fastest["lap_s"]))
+    print("PID_GAINS_FITTED = [{}]".format(", ".join(
+        "({speed}, {kp}, {ki}, {kd})".format(**r) for r in rows)))
+
+if __name__ == "__main__":
+    main()
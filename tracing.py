@@ -0,0 +1,123 @@
+# tracing.py
+# Records every call made on the hardware devices (sensor reads and motor
+# commands, with timestamps) plus the mission's decisions, so a run can be fed
+# back through main.py off the brick by sim/replay.py.
+#
+# Enabled with config.TRACE: hardware.py then calls attach(), which swaps its
+# devices for recording proxies. Trace lines are tab separated:
+#   time_ms  device  method  args  result
+# with device "decision" for the entries written by decision().
+import _thread
+from pybricks.tools import StopWatch
+import config
+
+# hardware.py names that get wrapped
+DEVICES = ("ev3", "left_motor", "right_motor", "arm_lift", "clamp",
+           "obstacle_sensor", "clamp_sensor", "line_sensor", "robot")
+# Attributes that are objects with methods of their own
+NESTED = ("control", "buttons", "speaker", "light", "screen", "battery")
+
+recorder = None  # sim/replay.py puts its own here before hardware is imported
+
+def encode(value):
+    # Values as Python source; pybricks constants print as e.g. Color.RED
+    if isinstance(value, list):
+        return "[" + ", ".join([encode(v) for v in value]) + "]"
+    if isinstance(value, tuple):
+        if len(value) == 1:
+            return "(" + encode(value[0]) + ",)"
+        return "(" + ", ".join([encode(v) for v in value]) + ")"
+    if isinstance(value, str):
+        return repr(value)
+    return str(value)
+
+def encode_args(args, kwargs):
+    parts = [encode(v) for v in args]
+    for key in kwargs:
+        parts.append(key + "=" + encode(kwargs[key]))
+    return ", ".join(parts)
+
+class Traced:
+    """Stands in for one device: every method call is passed through and
+    written to the recorder."""
+
+    def __init__(self, target, name, recorder):
+        self._target = target
+        self._name = name
+        self._recorder = recorder
+
+    def __getattr__(self, attr):
+        value = getattr(self._target, attr)
+        if attr in NESTED:
+            value = Traced(value, self._name + "." + attr, self._recorder)
+        elif callable(value):
+            value = self._recorder.method(self._name, attr, value)
+        else:
+            return value
+        setattr(self, attr, value)  # cached: later lookups skip __getattr__
+        return value
+
+class Recorder:
+    """Buffers trace lines and appends them to path every config.TRACE_FLUSH
+    records."""
+
+    def __init__(self, path, flush=None):
+        self.file = open(path, "w")
+        self.file.write("# trace v1\n")
+        self.flush_at = flush if flush is not None else config.TRACE_FLUSH
+        self.lines = []
+        self.count = 0
+        self.lock = _thread.allocate_lock()  # speech.py calls from its own thread
+        self.watch = StopWatch()
+
+    def wrap(self, device, name):
+        return Traced(device, name, self)
+
+    def method(self, name, attr, fn):
+        watch = self.watch
+        def call(*args, **kwargs):
+            t = watch.time()
+            result = fn(*args, **kwargs)
+            self.write(t, name, attr, encode_args(args, kwargs), encode(result))
+            return result
+        return call
+
+    def decision(self, kind, value):
+        self.write(self.watch.time(), "decision", kind, "", encode(value))
+
+    def write(self, t, name, attr, args, result):
+        line = "{}\t{}\t{}\t{}\t{}\n".format(t, name, attr, args, result)
+        with self.lock:
+            self.lines.append(line)
+            self.count += 1
+            if len(self.lines) >= self.flush_at:
+                self._flush()
+
+    def _flush(self):
+        self.file.write("".join(self.lines))
+        self.lines = []
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.file.close()
+        print("Trace: {} records".format(self.count))
+
+def attach(namespace):
+    # Called by hardware.py with its globals() when config.TRACE is set
+    global recorder
+    if recorder is None:
+        recorder = Recorder(config.TRACE_FILE)
+    for name in DEVICES:
+        namespace[name] = recorder.wrap(namespace[name], name)
+
+def decision(kind, value=None):
+    # Corner counted, station reached, item picked/dropped - what replay checks
+    if recorder is not None:
+        recorder.decision(kind, value)
+
+def close():
+    global recorder
+    if recorder is not None:
+        recorder.close()
+        recorder = None
@@ -0,0 +1,188 @@
+# trackmap.py
+# Odometry map of the loop, learned on the first lap: where the corners and
+# stations are, measured along the track from station 1. Once known (or loaded
+# from config.TRACK_MAP_FILE) the robot cruises at config.CRUISE_SPEED between
+# landmarks and only drives at DRIVE_SPEED inside a window around each one.
+import config
+
+STATION = "S"
+CORNER = "C"
+
+class TrackMap:
+    """lap_pos is the distance driven since station 1, kept across the
+    robot.reset() calls in main.py; every landmark seen snaps it back onto
+    the map."""
+
+    def __init__(self, path=None):
+        self.path = path  # None: learn every mission, keep nothing
+        self.landmarks = []   # (pos, kind, id) in lap order, station 1 at 0
+        self.positions = []   # just the pos column, for the per-tick lookup
+        self.lap = 0
+        self.lap_pos = -1     # -1: station 1 not seen yet
+        self.last_dist = 0
+        self.last_landmark = 0
+        self.next = 0         # index of the first landmark not yet left behind
+        self.learning = []    # landmarks of the lap being learned
+        self.corners = 0
+        self.snaps = 0
+        self.rejected = 0
+        if path is not None:
+            self.load()
+
+    def ready(self):
+        return self.lap > 0
+
+    # --- odometry ---
+    def advance(self, dist):
+        # Once per tick with robot.distance()
+        if self.lap_pos >= 0:
+            self.lap_pos += dist - self.last_dist
+        self.last_dist = dist
+
+    def odometer_reset(self):
+        # main.py called robot.reset()
+        self.last_dist = 0
+
+    # --- landmarks ---
+    def station(self, station_id):
+        if self.lap_pos >= 0 and self.lap_pos - self.last_landmark < config.MAP_MIN_GAP:
+            self.rejected += 1  # still on (or next to) the last pad
+            return
+        if station_id == 1:
+            if self.learning and not self.ready():
+                self._finish_lap()
+            self.learning = [(0, STATION, 1)]
+            self.corners = 0
+            self._snap(0)
+            return
+        if self.lap_pos < 0 and not self.ready():
+            return
+        if not self.ready():
+            self.learning.append((self.lap_pos, STATION, station_id))
+            self.last_landmark = self.lap_pos
+            return
+        for pos, kind, landmark_id in self.landmarks:
+            if kind == STATION and landmark_id == station_id:
+                self._snap(pos)
+
+    def corner(self):
+        if self.lap_pos < 0:
+            return
+        if not self.ready():
+            self.corners += 1
+            self.learning.append((self.lap_pos, CORNER, self.corners))
+            self.last_landmark = self.lap_pos
+            return
+        best = -1
+        for pos, kind, landmark_id in self.landmarks:
+            if kind == CORNER and abs(self.offset(pos)) <= config.MAP_SNAP:
+                if best < 0 or abs(self.offset(pos)) < abs(self.offset(best)):
+                    best = pos
+        if best < 0:
+            return
+        if (best - self.last_landmark) % self.lap > self.lap // 2:
+            self.rejected += 1  # behind the last landmark: landmarks come in lap order
+            return
+        self._snap(best)
+
+    def offset(self, pos):
+        # Mapped pos relative to lap_pos, wrapped to half a lap either way
+        # (lap_pos runs past the lap when station 1 is missed)
+        off = (pos - self.lap_pos) % self.lap
+        if off > self.lap // 2:
+            off -= self.lap
+        return off
+
+    def _snap(self, pos):
+        if self.lap_pos >= 0 and self.ready():
+            self.snaps += 1
+        self.lap_pos = pos
+        self.last_landmark = pos
+        self.next = 0
+        while self.next < len(self.positions) and \
+                self.positions[self.next] + config.MAP_WINDOW_AFTER < pos:
+            self.next += 1
+
+    def _fits_layout(self):
+        # The lap just learned has config.TRACK_LAYOUT's landmarks in order,
+        # stations numbered 1, 2, ... (a missed or spurious one does not)
+        layout = config.TRACK_LAYOUT
+        if layout is None:
+            return True
+        if len(self.learning) != len(layout):
+            return False
+        station = 0
+        for i in range(len(layout)):
+            pos, kind, landmark_id = self.learning[i]
+            if kind != layout[i]:
+                return False
+            if kind == STATION:
+                station += 1
+                if landmark_id != station:
+                    return False
+        return True
+
+    def _finish_lap(self):
+        if not self._fits_layout():
+            print("Track map: lap does not match TRACK_LAYOUT, learning again")
+            return
+        self.lap = self.lap_pos
+        self.landmarks = self.learning
+        self.positions = [pos for pos, kind, landmark_id in self.landmarks]
+        print("Track map: lap {} mm, {} landmarks".format(self.lap, len(self.landmarks)))
+        self.save()
+
+    # --- speed ---
+    def distance_to_next(self):
+        """Predicted mm to the next landmark, negative while still within
+        MAP_WINDOW_AFTER past the last one; None without a map or when lost."""
+        if self.lap == 0 or self.lap_pos < 0:
+            return None
+        positions = self.positions
+        while self.next < len(positions) and \
+                positions[self.next] + config.MAP_WINDOW_AFTER < self.lap_pos:
+            self.next += 1
+        if self.next < len(positions):
+            return positions[self.next] - self.lap_pos
+        if self.lap_pos <= self.lap:
+            return self.lap - self.lap_pos  # station 1 again
+        return None  # past the end of the lap: lost
+
+    def speed(self):
+        # Cruise between landmarks, DRIVE_SPEED near them or without a map
+        ahead = self.distance_to_next()
+        if ahead is None or ahead < config.MAP_WINDOW_BEFORE:
+            return config.DRIVE_SPEED
+        return config.CRUISE_SPEED
+
+    # --- file ---
+    def save(self):
+        if self.path is None:
+            return
+        with open(self.path, "w") as f:
+            f.write("# track map: kind id position (mm from station 1)\n")
+            f.write("lap {}\n".format(self.lap))
+            for pos, kind, landmark_id in self.landmarks:
+                f.write("{} {} {}\n".format(kind, landmark_id, pos))
+
+    def load(self):
+        try:
+            f = open(self.path)
+        except OSError:
+            return
+        landmarks = []
+        lap = 0
+        with f:
+            for line in f:
+                parts = line.split()
+                if not parts or parts[0].startswith("#"):
+                    continue
+                if parts[0] == "lap":
+                    lap = int(parts[1])
+                else:
+                    landmarks.append((int(parts[2]), parts[0], int(parts[1])))
+        if lap > 0 and landmarks:
+            self.lap = lap
+            self.landmarks = landmarks
+            self.positions = [pos for pos, kind, landmark_id in landmarks]
+            print("Track map loaded: lap {} mm, {} landmarks".format(lap, len(landmarks)))